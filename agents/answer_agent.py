@@ -2,27 +2,121 @@
 Answer Generator Agent: formats citations and produces final grounded answer.
 
 Exposes `AnswerAgent.generate_answer(fused_evidence, user_query)` which
-returns a dict with `answer` (string), `citations` (list), and `sources`.
+returns a dict with `answer` (string), `citations` (list), and `sources`,
+`AnswerAgent.generate_answer_stream(...)` which yields the answer text
+as it is generated, and `AnswerAgent.generate_answers_batched(...)` which
+answers several queries with shared LLM requests.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional
+import hashlib
 import logging
+import re
 
+from config import config
 from llm.factory import get_llm
+from llm.semantic_cache import CacheConfig, SemanticCache
 
 logger = logging.getLogger(__name__)
 
+# Static prompt text, kept byte-identical across calls so providers with
+# prefix-based prompt caching can reuse it. The answer instructions open the
+# user message: GeminiLLM.chat sends non-user messages as prior model turns.
+ANSWER_SYSTEM_PROMPT = "You are a helpful assistant that must cite sources and avoid adding new facts."
+ANSWER_PROMPT_HEADER = (
+    "You are an assistant that must not hallucinate. Answer concisely using only the provided evidence.\n"
+    "Produce a short answer (3-6 sentences) and attach inline numeric citations like [1], [2]. "
+    "Then list the referenced sources and their metadata.\n"
+    "\nEvidence:"
+)
+
+# Returned without calling the LLM when retrieval produced no evidence
+NO_EVIDENCE_ANSWER = "No relevant evidence was found."
+
+# Several questions answered in one request: each carries its own evidence
+# and the reply is split back into answers on the numbered markers
+ANSWER_BATCH_HEADER = (
+    "You are an assistant that must not hallucinate. Answer each numbered question below "
+    "independently, using only the evidence listed with that question.\n"
+    "For each question produce a short answer (3-6 sentences) with inline numeric citations "
+    "like [1], [2] that refer to that question's evidence.\n"
+    "Start each answer on its own line with '### Answer <n>', where <n> is the question number, "
+    "and write nothing before the first answer."
+)
+_BATCH_ANSWER_RE = re.compile(r'^### Answer (\d+)[ \t]*$', re.MULTILINE)
+
+# Most questions marshalled into one request; larger batches slow every answer in them
+ANSWER_BATCH_SIZE = 5
+
 
 class AnswerAgent:
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, cache: Optional[SemanticCache] = None):
         self.llm = llm or get_llm()
+        self.cache = cache
+
+    @staticmethod
+    def _citation_key(citations: List[Dict[str, Any]]) -> bytes:
+        """Hash the top citation sources so cached answers are tied to their evidence."""
+        sources = sorted(str(c.get('source') or '') for c in citations[:5])
+        return hashlib.blake2b('\n'.join(sources).encode('utf-8'), digest_size=16).digest()
+
+    def _embed_query(self, user_query: str):
+        try:
+            return self.llm.embed(user_query)
+        except Exception as e:
+            logger.warning(f"Query embedding for semantic cache failed: {e}")
+            return None
 
     def _format_citations(self, citations: List[Dict[str, Any]]) -> str:
-        lines = []
-        for i, c in enumerate(citations, start=1):
-            src = c.get('source') or c.get('url') or 'unknown'
-            stype = c.get('source_type', 'unknown')
-            lines.append(f"[{i}] {src} ({stype})")
-        return "\n".join(lines)
+        return "\n".join(
+            f"[{i}] {c.get('source') or c.get('url') or 'unknown'} ({c.get('source_type', 'unknown')})"
+            for i, c in enumerate(citations, start=1)
+        )
+
+    @staticmethod
+    def _evidence_lines(citations: List[Dict[str, Any]]) -> str:
+        return "".join(
+            f"\n[{i}] {c.get('claim', '')} (source: {c.get('source', '')})"
+            for i, c in enumerate(citations[:15], start=1)
+        )
+
+    def _build_prompt(self, citations: List[Dict[str, Any]], user_query: str) -> str:
+        # Static header, then evidence, then the user question last
+        return f"{ANSWER_PROMPT_HEADER}{self._evidence_lines(citations)}\n\nUser question: {user_query}"
+
+    def _build_batch_prompt(self, items: List[tuple]) -> str:
+        """Marshal (citations, user_query) pairs into one numbered prompt."""
+        questions = "".join(
+            f"\n\n### Question {n}\nEvidence:{self._evidence_lines(citations)}\nUser question: {user_query}"
+            for n, (citations, user_query) in enumerate(items, start=1)
+        )
+        return f"{ANSWER_BATCH_HEADER}{questions}"
+
+    @staticmethod
+    def _split_batch_reply(reply: str, count: int) -> Dict[int, str]:
+        """Map question number (1-based) to its answer text in a batched reply."""
+        parts = _BATCH_ANSWER_RE.split(reply)
+        answers = {}
+        # parts = [preamble, n1, text1, n2, text2, ...]
+        for number, text in zip(parts[1::2], parts[2::2]):
+            n = int(number)
+            text = text.strip()
+            if 1 <= n <= count and text and n not in answers:
+                answers[n] = text
+        return answers
+
+    def _cache_lookup(self, user_query: str, citations: List[Dict[str, Any]]):
+        """Return (query embedding, citation key, cached answer or None)."""
+        if self.cache is None:
+            return None, None, None
+        q_emb = self._embed_query(user_query)
+        cite_key = self._citation_key(citations)
+        if q_emb is None:
+            return None, cite_key, None
+        return q_emb, cite_key, self.cache.get(q_emb, key=cite_key)
+
+    @staticmethod
+    def _fallback_answer(citations: List[Dict[str, Any]]) -> str:
+        return ' '.join([c.get('claim', '') for c in citations[:3]])
 
     def generate_answer(self, fused: Dict[str, Any], user_query: str) -> Dict[str, Any]:
         """Generate a final answer from fused evidence.
@@ -32,37 +126,115 @@ class AnswerAgent:
             user_query: Original user query (for context)
 
         Returns:
-            { 'answer': str, 'citations': list, 'sources_text': str }
+            { 'answer': str, 'citations': list, 'sources_text': str }. With no
+            evidence the LLM is not called and NO_EVIDENCE_ANSWER is returned.
         """
         citations = fused.get('evidence', [])
-        prompt_lines = [
-            "You are an assistant that must not hallucinate. Answer concisely using only the provided evidence.",
-            f"User question: {user_query}",
-            "Evidence:"
-        ]
-        for i, c in enumerate(citations[:15], start=1):
-            claim = c.get('claim', '')
-            src = c.get('source', '')
-            prompt_lines.append(f"[{i}] {claim} (source: {src})")
-
-        prompt_lines.append("\nProduce a short answer (3-6 sentences) and attach inline numeric citations like [1], [2]. Then list the referenced sources and their metadata.")
-        prompt = "\n".join(prompt_lines)
+        if not citations:
+            return {"answer": NO_EVIDENCE_ANSWER, "citations": [], "sources_text": ""}
+        prompt = self._build_prompt(citations, user_query)
+
+        q_emb, cite_key, cached = self._cache_lookup(user_query, citations)
+        if cached is not None:
+            return {"answer": cached, "citations": citations, "sources_text": self._format_citations(citations)}
 
         try:
             messages = [
-                {"role": "system", "content": "You are a helpful assistant that must cite sources and avoid adding new facts."},
+                {"role": "system", "content": ANSWER_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ]
             resp = self.llm.chat(messages)
+            if q_emb is not None:
+                self.cache.put(q_emb, resp, key=cite_key)
             sources_text = self._format_citations(citations)
             return {"answer": resp, "citations": citations, "sources_text": sources_text}
         except Exception as e:
             logger.error(f"Answer generation failed: {e}")
             # Fallback: simple aggregation
-            short = ' '.join([c.get('claim', '') for c in citations[:3]])
+            short = self._fallback_answer(citations)
             sources_text = self._format_citations(citations)
             return {"answer": short, "citations": citations, "sources_text": sources_text}
 
+    def generate_answer_stream(self, fused: Dict[str, Any], user_query: str) -> Iterator[str]:
+        """Stream the answer for fused evidence as text chunks.
+
+        Uses the same prompt and semantic cache as `generate_answer`; a cache
+        hit, or the no-evidence answer, is yielded as a single chunk. If the provider fails before
+        producing any text, the fallback aggregation is yielded instead.
+        """
+        citations = fused.get('evidence', [])
+        if not citations:
+            yield NO_EVIDENCE_ANSWER
+            return
+        prompt = self._build_prompt(citations, user_query)
+
+        q_emb, cite_key, cached = self._cache_lookup(user_query, citations)
+        if cached is not None:
+            yield cached
+            return
+
+        parts = []
+        try:
+            # stream_complete takes a single prompt, so the system text leads it
+            for chunk in self.llm.stream_complete(f"{ANSWER_SYSTEM_PROMPT}\n\n{prompt}"):
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error(f"Streaming answer generation failed: {e}")
+            if not parts:
+                yield self._fallback_answer(citations)
+            return
+        if q_emb is not None and parts:
+            self.cache.put(q_emb, ''.join(parts), key=cite_key)
+
+    def generate_answers_batched(
+        self,
+        fused_list: List[Dict[str, Any]],
+        user_queries: List[str],
+        batch_size: int = ANSWER_BATCH_SIZE,
+    ) -> List[Dict[str, Any]]:
+        """Answer several queries, marshalling up to batch_size of them per LLM request.
+
+        Returns one `generate_answer`-shaped dict per query, in order. Cached
+        answers are reused; a query whose answer is missing from the batched
+        reply, or whose batch request fails, is answered on its own.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(user_queries)
+        pending = []
+        for i, (fused, user_query) in enumerate(zip(fused_list, user_queries)):
+            citations = fused.get('evidence', [])
+            if not citations:
+                results[i] = {"answer": NO_EVIDENCE_ANSWER, "citations": [], "sources_text": ""}
+                continue
+            q_emb, cite_key, cached = self._cache_lookup(user_query, citations)
+            if cached is not None:
+                results[i] = {"answer": cached, "citations": citations, "sources_text": self._format_citations(citations)}
+            else:
+                pending.append((i, citations, user_query, q_emb, cite_key))
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            answers = {}
+            if len(batch) > 1:
+                prompt = self._build_batch_prompt([(citations, user_query) for _, citations, user_query, _, _ in batch])
+                try:
+                    reply = self.llm.chat([
+                        {"role": "system", "content": ANSWER_SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ])
+                    answers = self._split_batch_reply(reply, len(batch))
+                except Exception as e:
+                    logger.warning(f"Batched answer generation failed, answering one by one: {e}")
+            for n, (i, citations, user_query, q_emb, cite_key) in enumerate(batch, start=1):
+                answer = answers.get(n)
+                if answer is None:
+                    results[i] = self.generate_answer({'evidence': citations}, user_query)
+                    continue
+                if q_emb is not None:
+                    self.cache.put(q_emb, answer, key=cite_key)
+                results[i] = {"answer": answer, "citations": citations, "sources_text": self._format_citations(citations)}
+        return results
+
 
 # Convenience
 _default_answer_agent = None
@@ -70,5 +242,12 @@ _default_answer_agent = None
 def get_answer_agent() -> AnswerAgent:
     global _default_answer_agent
     if _default_answer_agent is None:
-        _default_answer_agent = AnswerAgent()
+        cache = None
+        if config.SEMANTIC_CACHE:
+            cache = SemanticCache(CacheConfig(
+                similarity_threshold=config.SEMANTIC_CACHE_THRESHOLD,
+                ttl=config.SEMANTIC_CACHE_TTL,
+                float16=config.SEMANTIC_CACHE_FLOAT16,
+            ))
+        _default_answer_agent = AnswerAgent(cache=cache)
     return _default_answer_agent
@@ -11,7 +11,11 @@ Provides:
 This is a lightweight agent API intended for orchestration layers.
 """
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import queue
+import threading
+import time
 from pathlib import Path
 
 from ingestion.index_builder import IndexBuilder
@@ -19,6 +23,15 @@ from ingestion.document_loader import DocumentLoader
 
 logger = logging.getLogger(__name__)
 
+# Directory ingestion pipeline: loader threads feed a bounded queue that a
+# single indexer thread drains in micro-batches.
+LOAD_WORKERS = 4
+LOAD_QUEUE_SIZE = 64
+INDEX_BATCH_SIZE = 32
+PROGRESS_LOG_INTERVAL = 30.0
+
+_DONE = object()
+
 
 class DocRAGAgent:
     """Document-centric RAG agent using LlamaIndex via IndexBuilder."""
@@ -31,7 +44,8 @@ class DocRAGAgent:
 
         Returns the document_id used.
         """
-        doc = DocumentLoader.load(file_path)
+        # Streamable formats (CSV) are indexed block by block, not loaded whole
+        doc = DocumentLoader.load(file_path, stream=True)
         doc_id = document_id or Path(file_path).stem
         self.index_builder.add_document(
             document_content=doc["content"],
@@ -43,20 +57,72 @@ class DocRAGAgent:
         return doc_id
 
     def ingest_directory(self, directory: str) -> List[str]:
-        """Load all supported files in a directory and add to the index."""
-        docs = DocumentLoader.load_multiple(directory)
-        prepared = []
-        for d in docs:
-            prepared.append({
-                "content": d["content"],
-                "id": Path(d["file_path"]).stem,
-                "source": d["file_path"],
-                "metadata": {"filename": d["filename"]},
-            })
-        ids = self.index_builder.add_documents_batch(prepared)
+        """Load all supported files in a directory and add to the index.
+
+        Files are read by a small thread pool while a single indexer thread
+        embeds and inserts them in batches, so disk reads overlap indexing.
+        Returned ids follow completion order, not directory order.
+        """
+        files = [Path(p) for p in DocumentLoader.supported_files(directory)]
+        pending: queue.Queue = queue.Queue(maxsize=LOAD_QUEUE_SIZE)
+        ids: List[str] = []
+        indexer = threading.Thread(
+            target=self._index_from_queue,
+            args=(pending, len(files), ids),
+            name="doc-indexer",
+            daemon=True,
+        )
+        indexer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS, thread_name_prefix="doc-loader") as pool:
+                for file_path in files:
+                    pool.submit(self._load_into_queue, file_path, pending)
+        finally:
+            pending.put(_DONE)
+            indexer.join()
         logger.info(f"Ingested directory {directory} with {len(ids)} documents")
         return ids
 
+    @staticmethod
+    def _load_into_queue(file_path: Path, pending: queue.Queue) -> None:
+        """Load one file and queue it for indexing (None marks a failed load)."""
+        try:
+            d = DocumentLoader.load(str(file_path))
+            logger.info(f"Loaded: {file_path.name}")
+        except Exception as e:
+            logger.warning(f"Failed to load {file_path.name}: {e}")
+            pending.put(None)
+            return
+        pending.put({
+            "content": d["content"],
+            "id": Path(d["file_path"]).stem,
+            "source": d["file_path"],
+            "metadata": {"filename": d["filename"]},
+        })
+
+    def _index_from_queue(self, pending: queue.Queue, total: int, ids: List[str]) -> None:
+        """Drain loaded documents into the index in batches, logging progress."""
+        batch = []
+        done = 0
+        started = last_log = time.monotonic()
+        while True:
+            item = pending.get()
+            if item is _DONE:
+                break
+            done += 1
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= INDEX_BATCH_SIZE:
+                ids.extend(self.index_builder.add_documents_batch(batch))
+                batch = []
+            now = time.monotonic()
+            if now - last_log >= PROGRESS_LOG_INTERVAL:
+                eta = (now - started) / done * (total - done)
+                logger.info(f"Ingestion progress: {done}/{total} files, ETA {eta:.0f}s")
+                last_log = now
+        if batch:
+            ids.extend(self.index_builder.add_documents_batch(batch))
+
     def retrieve(self, query: str, top_k: Optional[int] = None) -> List[Dict[str, Any]]:
         """Retrieve top_k document passages relevant to the query."""
         return self.index_builder.retrieve(query=query, top_k=top_k)
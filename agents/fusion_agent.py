@@ -7,19 +7,85 @@ Responsibilities:
 - Produce citation objects
 - Optionally synthesize a short combined summary using the LLM
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+import heapq
 import logging
-from collections import OrderedDict
+import zlib
+from operator import itemgetter
+
+import numpy as np
 
 from llm.factory import get_llm
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Static prompt text, kept as constants so the prompt prefix is identical across calls
+SYNTHESIS_SYSTEM_PROMPT = 'You are an expert assistant that must not hallucinate. Use only the provided evidence.'
+SUMMARY_PROMPT_HEADER = (
+    "Synthesize the following evidence into a concise, grounded answer with inline citations.\n"
+    "Provide a short answer (3-5 sentences) and list the sources by number.\n"
+    "\nEvidence:"
+)
+
+
+class ShingleLSH:
+    """MinHash LSH over character shingles for near-duplicate text detection.
+
+    Each text is reduced to a fixed-size MinHash signature of its 5-char
+    shingles; signatures are bucketed by band so only texts sharing a band
+    are compared. A text is a duplicate when its estimated Jaccard similarity
+    to an accepted text reaches `threshold`.
+    """
+
+    SHINGLE_SIZE = 5
+    NUM_PERM = 64
+    BANDS = 8
+    _PRIME = np.uint64((1 << 61) - 1)
+    # a*h + b stays below 2**64 for 32-bit a, b and crc32 hashes h
+    _A = np.random.default_rng(0).integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+    _B = np.random.default_rng(1).integers(0, 1 << 32, NUM_PERM, dtype=np.uint64)
+
+    def __init__(self, threshold: float = 0.8):
+        self.threshold = threshold
+        self._signatures: List[np.ndarray] = []
+        self._buckets: Dict[Any, List[int]] = {}
+
+    def _signature(self, text: str) -> np.ndarray:
+        k = self.SHINGLE_SIZE
+        shingles = {text[i:i + k] for i in range(max(1, len(text) - k + 1))}
+        hashes = np.fromiter((zlib.crc32(sh.encode('utf-8')) for sh in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._A[:, None] * hashes[None, :] + self._B[:, None]) % self._PRIME).min(axis=1)
+
+    def add_if_new(self, text: str) -> bool:
+        """Index text and return True, or return False if it is a near-duplicate."""
+        sig = self._signature(text)
+        rows = self.NUM_PERM // self.BANDS
+        bands = [(b, sig[b * rows:(b + 1) * rows].tobytes()) for b in range(self.BANDS)]
+        candidates = {i for band in bands for i in self._buckets.get(band, ())}
+        for i in candidates:
+            if float(np.mean(self._signatures[i] == sig)) >= self.threshold:
+                return False
+        idx = len(self._signatures)
+        self._signatures.append(sig)
+        for band in bands:
+            self._buckets.setdefault(band, []).append(idx)
+        return True
+
 
 class FusionAgent:
-    def __init__(self, verbose: bool = False):
+    # Maximum characters kept per claim; applied once here so prompt builders never re-slice
+    CLAIM_MAX = 240
+    # Evidence kept after ranking; AnswerAgent reads at most this many citations
+    MAX_EVIDENCE = 15
+
+    def __init__(self, llm=None, verbose: bool = False, semantic_dedup: bool = False, dedup_threshold: float = 0.9):
+        self.llm = llm or get_llm()
         self.verbose = verbose
+        # Embedding-based dedup costs one embedding call per fuse(); off by default
+        self.semantic_dedup = semantic_dedup
+        # Cosine similarity above which two claims are treated as duplicates
+        self.dedup_threshold = dedup_threshold
         # priority weights (documents > web)
         self.source_priority = {
             'document': 1.2,
@@ -27,7 +93,7 @@ class FusionAgent:
         }
 
     def _normalize_snippet(self, text: str) -> str:
-        return ' '.join(text.strip().split())[:500]
+        return ' '.join(text.strip().split())[:self.CLAIM_MAX]
 
     def _make_citation(self, claim: str, source_type: str, source: str, url: str = None, confidence: float = 0.5) -> Dict[str, Any]:
         return {
@@ -48,46 +114,37 @@ class FusionAgent:
         Returns:
             { 'evidence': [citation objects], 'summary_prompt': str }
         """
-        merged = []
-        seen = set()
+        candidates = []
 
-        # Process document results first (higher priority)
+        # Document results first (higher priority when deduplicating)
         for d in doc_results or []:
             snippet = self._normalize_snippet(d.get('content', d.get('text', '')))
-            key = snippet[:200]
-            if key in seen:
-                continue
-            seen.add(key)
             score = d.get('score') or 0.6
             source = d.get('source', d.get('metadata', {}).get('source', 'internal'))
-            citation = self._make_citation(
+            candidates.append(self._make_citation(
                 claim=snippet,
                 source_type='document',
                 source=source,
                 url=d.get('metadata', {}).get('original_path') or None,
                 confidence=min(1.0, score * self.source_priority['document'])
-            )
-            merged.append(citation)
+            ))
 
         # Then web results
         for w in web_results or []:
             snippet = self._normalize_snippet(w.get('snippet', w.get('title', '')))
-            key = snippet[:200]
-            if key in seen:
-                continue
-            seen.add(key)
             score = w.get('confidence', 0.5)
-            citation = self._make_citation(
+            candidates.append(self._make_citation(
                 claim=snippet,
                 source_type='internet',
                 source=w.get('title') or w.get('url'),
                 url=w.get('url'),
                 confidence=min(1.0, score * self.source_priority['internet'])
-            )
-            merged.append(citation)
+            ))
 
-        # Rank evidence by confidence descending
-        merged = sorted(merged, key=lambda x: x['confidence'], reverse=True)
+        merged = self._dedup(candidates)
+
+        # Keep the top evidence by confidence, descending (ties keep input order)
+        merged = heapq.nlargest(self.MAX_EVIDENCE, merged, key=itemgetter('confidence'))
 
         # Build a small prompt for the Answer Generator if needed
         summary_prompt = self._build_summary_prompt(merged)
@@ -97,20 +154,65 @@ class FusionAgent:
             'summary_prompt': summary_prompt,
         }
 
+    def _embed_claims(self, claims: List[str]) -> Optional[np.ndarray]:
+        """Embed non-empty claims in one batch and L2-normalize the rows.
+
+        Returns None if embedding fails; rows for empty claims (or zero vectors
+        returned by a provider fallback) are left as zeros.
+        """
+        idx = [i for i, claim in enumerate(claims) if claim]
+        if not idx:
+            return None
+        try:
+            embedded = np.asarray(self.llm.embed_many([claims[i] for i in idx]), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Claim embedding failed, using shingle dedup: {e}")
+            return None
+        if embedded.ndim != 2 or embedded.shape[0] != len(idx):
+            return None
+        norms = np.linalg.norm(embedded, axis=1, keepdims=True)
+        vectors = np.zeros((len(claims), embedded.shape[1]), dtype=np.float32)
+        vectors[idx] = embedded / np.where(norms == 0, 1.0, norms)
+        return vectors
+
+    def _dedup(self, citations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Drop near-duplicate claims, keeping the earliest (highest priority) one.
+
+        Claims are compared by embedding cosine similarity; claims without a
+        usable embedding fall back to MinHash LSH over character shingles.
+        """
+        vectors = self._embed_claims([c['claim'] for c in citations]) if self.semantic_dedup else None
+        if vectors is not None:
+            # All pairwise similarities in one matmul; the greedy pass below
+            # only reads the rows of claims it has already accepted
+            similar = (vectors @ vectors.T) > self.dedup_threshold
+            has_vec = vectors.any(axis=1)
+            accepted = np.zeros(len(citations), dtype=bool)
+        lsh = ShingleLSH()
+        merged = []
+        for i, citation in enumerate(citations):
+            if vectors is None or not has_vec[i]:
+                if not lsh.add_if_new(citation['claim']):
+                    continue
+            else:
+                if similar[i, :i][accepted[:i]].any():
+                    continue
+                accepted[i] = True
+            merged.append(citation)
+        return merged
+
     def _build_summary_prompt(self, citations: List[Dict[str, Any]]) -> str:
-        lines = ["Synthesize the following evidence into a concise, grounded answer with inline citations:"]
-        for i, c in enumerate(citations[:10], start=1):
-            src = c['source']
-            lines.append(f"[{i}] ({c['source_type']}) {c['claim'][:300]} -- source: {src}")
-        lines.append('\nProvide a short answer (3-5 sentences) and list the sources by number.')
-        return '\n'.join(lines)
+        evidence = '\n'.join(
+            f"[{i}] ({c['source_type']}) {c['claim']} -- source: {c['source']}"
+            for i, c in enumerate(citations[:10], start=1)
+        )
+        return f"{SUMMARY_PROMPT_HEADER}\n{evidence}" if evidence else SUMMARY_PROMPT_HEADER
 
     def synthesize_answer(self, fused: Dict[str, Any], max_tokens: int = 512) -> Dict[str, Any]:
         """Use the configured LLM to synthesize a final answer from fused evidence.
 
         Returns a dict with 'answer' and 'citations'.
         """
-        llm = get_llm()
         prompt = fused.get('summary_prompt')
         if not prompt:
             return {'answer': '', 'citations': fused.get('evidence', [])}
@@ -118,10 +220,10 @@ class FusionAgent:
         try:
             # Use a chat-style call if available
             messages = [
-                {'role': 'system', 'content': 'You are an expert assistant that must not hallucinate. Use only the provided evidence.'},
+                {'role': 'system', 'content': SYNTHESIS_SYSTEM_PROMPT},
                 {'role': 'user', 'content': prompt},
             ]
-            resp = llm.chat(messages)
+            resp = self.llm.chat(messages)
             return {'answer': resp, 'citations': fused.get('evidence', [])}
         except Exception as e:
             logger.error(f"LLM synthesis failed: {e}")
@@ -136,5 +238,8 @@ _default_fusion_agent = None
 def get_fusion_agent() -> FusionAgent:
     global _default_fusion_agent
     if _default_fusion_agent is None:
-        _default_fusion_agent = FusionAgent()
+        _default_fusion_agent = FusionAgent(
+            semantic_dedup=config.SEMANTIC_DEDUP,
+            dedup_threshold=config.SEMANTIC_DEDUP_THRESHOLD,
+        )
     return _default_fusion_agent
@@ -9,6 +9,14 @@ directly from orchestration code.
 from typing import Dict, Any
 import re
 
+# Keyword classes compiled once into a single case-insensitive alternation each.
+# Words are matched from a word start so "our" does not hit "your"/"four", while
+# suffixes keep plurals and derived forms ("reports", "researchers", "statistical").
+WEB_RE = re.compile(
+    r"\b(?:latest|recent\w*|research\w*|reports?|news|trend\w*|stat(?:es?|istic\w*))\b|202\d",
+    re.IGNORECASE,
+)
+INTERNAL_RE = re.compile(r"\b(?:ours?|internal\w*|compan(?:y|ies)|clients?|confidential)\b", re.IGNORECASE)
 
 class RouterAgent:
     """Simple router to decide retrieval sources for a query.
@@ -19,41 +27,14 @@ class RouterAgent:
     - Query scope words that imply internal-only
     """
 
-    WEB_KEYWORDS = [
-        r"latest",
-        r"recent",
-        r"202\d",
-        r"research",
-        r"report",
-        r"news",
-        r"trends",
-        r"stat(e|istics)",
-    ]
-
-    INTERNAL_KEYWORDS = [
-        r"our",
-        r"internal",
-        r"company",
-        r"client",
-        r"confidential",
-    ]
-
     def __init__(self, verbose: bool = False):
         self.verbose = verbose
 
     def _looks_like_web_query(self, query: str) -> bool:
-        q = query.lower()
-        for kw in self.WEB_KEYWORDS:
-            if re.search(kw, q):
-                return True
-        return False
+        return bool(WEB_RE.search(query))
 
     def _looks_like_internal_only(self, query: str) -> bool:
-        q = query.lower()
-        for kw in self.INTERNAL_KEYWORDS:
-            if re.search(kw, q):
-                return True
-        return False
+        return bool(INTERNAL_RE.search(query))
 
     def decide(self, query: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
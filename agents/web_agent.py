@@ -1,26 +1,64 @@
 """
 Web Search Agent (LangChain-style wrapper).
 
-Provides a simple `WebAgent.search(query, top_k)` API that attempts to
-use configured search providers (SerpAPI, Tavily) and falls back to a
-lightweight HTTP fetch when those aren't configured.
+Provides a simple `WebAgent.search(query, top_k)` API that races the
+configured search providers (SerpAPI, Tavily), returns the first non-empty
+result set, and falls back to a lightweight HTTP fetch when none of them
+are configured or all of them come back empty.
 
 Returned results are normalized into a list of citation-like dicts:
 { 'title', 'url', 'snippet', 'source_type', 'confidence' }
 """
 from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from itertools import islice
 import logging
+import re
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import config
 
 logger = logging.getLogger(__name__)
 
+# Shared session so provider calls reuse pooled keep-alive TCP/TLS connections;
+# transient rate-limit and 5xx responses are retried with a short backoff
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, backoff_factor=0.1, status_forcelist=[429, 500, 502, 503, 504]),
+))
+
+# Shared pool for racing the keyed providers (SerpAPI, Tavily, plus headroom)
+_SEARCH_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="web-search")
+
+# DuckDuckGo HTML result anchors: captures (href, title)
+_DDG_RESULT_RE = re.compile(r'<a rel="nofollow" class="result__a"[^>]*?href="([^"]*)"[^>]*>([^<]*)<', re.IGNORECASE)
+
 
 class WebAgent:
+    # (connect, read) timeout for each provider HTTP call
+    REQUEST_TIMEOUT = (2, 5)
+    # Overall budget for the concurrent provider race in `search`
+    SEARCH_TIMEOUT = 8.0
+
     def __init__(self, provider: Optional[str] = None):
         self.provider = provider or config.web_search.get("provider", "tavily") if hasattr(config, 'web_search') else "tavily"
         self.serpapi_key = config.SERPAPI_API_KEY
         self.tavily_key = config.TAVILY_API_KEY
+        self._tavily_client = self._init_tavily_client()
+
+    def _init_tavily_client(self):
+        """Build the Tavily client once; None if unconfigured or the SDK is missing."""
+        if not self.tavily_key:
+            return None
+        try:
+            import tavily
+            return tavily.Client(api_key=self.tavily_key)
+        except Exception as e:
+            logger.warning(f"Tavily client unavailable: {e}")
+            return None
 
     def _search_serpapi(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search using SerpAPI (if API key present)."""
@@ -33,7 +71,7 @@ class WebAgent:
                 'num': top_k,
                 'api_key': self.serpapi_key,
             }
-            resp = requests.get('https://serpapi.com/search', params=params, timeout=10)
+            resp = _SESSION.get('https://serpapi.com/search', params=params, timeout=self.REQUEST_TIMEOUT)
             resp.raise_for_status()
             data = resp.json()
             results = []
@@ -52,12 +90,10 @@ class WebAgent:
 
     def _search_tavily(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Search using Tavily SDK if available and configured."""
-        if not self.tavily_key:
+        if self._tavily_client is None:
             return []
         try:
-            import tavily
-            client = tavily.Client(api_key=self.tavily_key)
-            hits = client.search(query, limit=top_k)
+            hits = self._tavily_client.search(query, limit=top_k)
             results = []
             for h in hits:
                 results.append({
@@ -79,27 +115,13 @@ class WebAgent:
         """
         try:
             # Use DuckDuckGo HTML for a simple result set
-            resp = requests.get('https://duckduckgo.com/html/', params={'q': query}, timeout=10, headers={'User-Agent': 'aisys-bot/1.0'})
+            resp = _SESSION.get('https://duckduckgo.com/html/', params={'q': query}, timeout=self.REQUEST_TIMEOUT, headers={'User-Agent': 'aisys-bot/1.0'})
             resp.raise_for_status()
-            text = resp.text
-            # Very simple parsing to find links/snippets
             results = []
-            # Use naive split heuristics to extract top_k results
-            parts = text.split('<a rel="nofollow" class="result__a"')
-            for p in parts[1:top_k+1]:
-                # extract href
-                try:
-                    href_part = p.split('href="', 1)[1]
-                    url = href_part.split('"', 1)[0]
-                except Exception:
-                    url = ''
-                # extract title
-                try:
-                    title = p.split('>')[1].split('<', 1)[0]
-                except Exception:
-                    title = url
+            for match in islice(_DDG_RESULT_RE.finditer(resp.text), top_k):
+                url, title = match.group(1), match.group(2)
                 results.append({
-                    'title': title,
+                    'title': title or url,
                     'url': url,
                     'snippet': '',
                     'source_type': 'internet',
@@ -110,18 +132,42 @@ class WebAgent:
             logger.warning(f"Simple HTTP search failed: {e}")
             return []
 
+    def _race(self, providers, query: str, top_k: int) -> List[Dict[str, Any]]:
+        """Run providers concurrently and return the first non-empty result set.
+
+        Pending calls are cancelled once a winner is found; calls that are
+        already running cannot be interrupted and finish in the background
+        with their results discarded.
+        """
+        futures = [_SEARCH_POOL.submit(fn, query, top_k) for fn in providers]
+        try:
+            for future in as_completed(futures, timeout=self.SEARCH_TIMEOUT):
+                results = future.result()
+                if results:
+                    return results
+        except FuturesTimeoutError:
+            logger.warning(f"Web search timed out after {self.SEARCH_TIMEOUT}s")
+        finally:
+            for future in futures:
+                future.cancel()
+        return []
+
     def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
         """Public search method returning normalized results."""
-        # Try configured providers in order
-        results = []
+        providers = []
         if self.serpapi_key:
-            results = self._search_serpapi(query, top_k)
-            if results:
-                return results
+            providers.append(self._search_serpapi)
         if self.tavily_key:
-            results = self._search_tavily(query, top_k)
-            if results:
-                return results
+            providers.append(self._search_tavily)
+
+        if len(providers) > 1:
+            results = self._race(providers, query, top_k)
+        elif providers:
+            results = providers[0](query, top_k)
+        else:
+            results = []
+        if results:
+            return results
 
         # Final fallback
         return self._simple_http_search(query, top_k)
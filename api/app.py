@@ -5,23 +5,46 @@ Endpoints:
 - GET  /health
 - POST /upload  (multipart file upload)
 - POST /query   (JSON: {"query": "...", "top_k": 5})
+- POST /query/stream  (same body; Server-Sent Events)
 
-This wires into the orchestrator and DocRAG ingestion.
+This wires into the orchestrator and DocRAG ingestion. Blocking work (file
+copies, ingestion, orchestration) runs in the threadpool so the event loop
+stays free to serve other requests.
 """
 from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from pathlib import Path
-import shutil
+import functools
+import orjson
 import logging
+import time
 
 from config import config
 from orchestration.graph import Orchestrator
 from agents.doc_rag_agent import get_doc_rag_agent
+from api.uploads import dir_nonempty, save_upload
 
 logger = logging.getLogger(__name__)
-app = FastAPI(title=config.app.get('name', 'AI Answering System') if hasattr(config, 'app') else 'AI Answering System')
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _has_uploaded_docs
+    config.ensure_dirs()
+    _has_uploaded_docs = any(UPLOAD_DIR.iterdir())
+    yield
+
+
+app = FastAPI(
+    title=config.app.get('name', 'AI Answering System') if hasattr(config, 'app') else 'AI Answering System',
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS (allow local testing)
 app.add_middleware(
@@ -30,14 +53,36 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Query results (evidence + citations) compress well; SSE responses are left uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
-# Ensure upload dir exists
+# Created at startup by lifespan()
 UPLOAD_DIR = Path(getattr(config, 'UPLOAD_DIR', './storage/uploads'))
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 orch = Orchestrator()
 doc_agent = get_doc_rag_agent()
 
+# Seconds between re-scans of UPLOAD_DIR while no upload has been seen in this process
+UPLOAD_SCAN_TTL = 5.0
+
+
+@functools.lru_cache(maxsize=1)
+def _scan_upload_dir(_bucket: int) -> bool:
+    """Return True if UPLOAD_DIR has any entry; memoized per TTL bucket."""
+    return dir_nonempty(UPLOAD_DIR)
+
+
+# Set at startup and flipped by /upload so /query does not list the directory per request
+_has_uploaded_docs = False
+
+
+def _uploaded_docs_present() -> bool:
+    global _has_uploaded_docs
+    if not _has_uploaded_docs:
+        # Other workers may have received uploads; re-check at most once per TTL
+        _has_uploaded_docs = _scan_upload_dir(int(time.monotonic() // UPLOAD_SCAN_TTL))
+    return _has_uploaded_docs
+
 
 class QueryRequest(BaseModel):
     query: str
@@ -46,17 +91,17 @@ class QueryRequest(BaseModel):
 
 @app.get('/health')
 async def health():
-    return JSONResponse({'status': 'ok'})
+    return {'status': 'ok'}
 
 
 @app.post('/upload')
 async def upload_file(file: UploadFile = File(...)):
+    global _has_uploaded_docs
     # Save file
     filename = Path(file.filename).name
     save_path = UPLOAD_DIR / filename
     try:
-        with save_path.open('wb') as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(save_upload, file.file, save_path)
     except Exception as e:
         logger.error(f"Failed saving upload {filename}: {e}")
         raise HTTPException(status_code=500, detail='Failed to save file')
@@ -65,27 +110,47 @@ async def upload_file(file: UploadFile = File(...)):
 
     # Ingest into DocRAG
     try:
-        doc_id = doc_agent.ingest_file(str(save_path))
+        doc_id = await run_in_threadpool(doc_agent.ingest_file, str(save_path))
     except Exception as e:
         logger.error(f"Ingestion failed for {filename}: {e}")
         raise HTTPException(status_code=500, detail='Ingestion failed')
+    _has_uploaded_docs = True
 
-    return JSONResponse({'status': 'uploaded', 'filename': filename, 'document_id': doc_id})
+    return {'status': 'uploaded', 'filename': filename, 'document_id': doc_id}
 
 
 @app.post('/query')
 async def query(req: QueryRequest):
-    # Detect whether we have uploaded docs
-    has_uploaded_docs = any(UPLOAD_DIR.iterdir())
-    metadata = {'has_uploaded_docs': has_uploaded_docs, 'top_k': req.top_k}
+    metadata = {'has_uploaded_docs': _uploaded_docs_present(), 'top_k': req.top_k}
 
     try:
-        result = orch.run_query(req.query, metadata=metadata)
+        result = await orch.arun_query(req.query, metadata=metadata)
     except Exception as e:
         logger.error(f"Query orchestration failed: {e}")
         raise HTTPException(status_code=500, detail='Query failed')
 
-    return JSONResponse(result)
+    return result
+
+
+@app.post('/query/stream')
+async def query_stream(req: QueryRequest):
+    """Stream answer chunks as SSE `data:` events, then one `citations` event
+    carrying the full /query response."""
+    metadata = {'has_uploaded_docs': _uploaded_docs_present(), 'top_k': req.top_k}
+
+    # Sync generator: Starlette iterates it in the threadpool
+    def events():
+        try:
+            for kind, data in orch.stream_query(req.query, metadata=metadata):
+                if kind == 'token':
+                    yield b"data: " + orjson.dumps(data) + b"\n\n"
+                else:
+                    yield b"event: citations\ndata: " + orjson.dumps(data) + b"\n\n"
+        except Exception as e:
+            logger.error(f"Streaming query failed: {e}")
+            yield b'event: error\ndata: "Query failed"\n\n'
+
+    return StreamingResponse(events(), media_type='text/event-stream')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,67 @@
+"""
+Helpers for persisting uploaded files and checking for existing uploads.
+"""
+from pathlib import Path
+import io
+import logging
+import os
+import shutil
+import sys
+
+logger = logging.getLogger(__name__)
+
+# Chunk sizes for copying uploads to disk
+SENDFILE_CHUNK = 16 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _disk_fd(src):
+    """Return src's file descriptor if its data already lives on disk, else None.
+
+    A SpooledTemporaryFile that has not rolled over is held in memory, and
+    calling fileno() on it would force a rollover to a temp file first.
+    """
+    if not sys.platform.startswith('linux') or not getattr(src, '_rolled', True):
+        return None
+    try:
+        fd = src.fileno()
+        src.flush()
+        return fd
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def dir_nonempty(path) -> bool:
+    """Return True if the directory at path has any entry.
+
+    Stops at the first entry and builds no Path objects.
+    """
+    with os.scandir(path) as it:
+        return next(it, None) is not None
+
+
+def save_upload(src, save_path: Path) -> None:
+    """Copy an uploaded file object to save_path.
+
+    On Linux, uploads already backed by a file on disk are copied in-kernel
+    with os.sendfile; everything else uses a buffered copy.
+    """
+    start = src.tell()
+    in_fd = _disk_fd(src)
+    if in_fd is not None:
+        out_fd = os.open(save_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            offset = start
+            while True:
+                sent = os.sendfile(out_fd, in_fd, offset, SENDFILE_CHUNK)
+                if sent == 0:
+                    return
+                offset += sent
+        except OSError as e:
+            logger.warning(f"sendfile failed for {save_path}, using buffered copy: {e}")
+        finally:
+            os.close(out_fd)
+        src.seek(start)
+
+    with Path(save_path).open('wb') as buffer:
+        shutil.copyfileobj(src, buffer, length=COPY_BUFFER_SIZE)
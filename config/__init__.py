@@ -1,14 +1,21 @@
 """
 Configuration management for the AI Answering System.
 """
+import functools
 import os
 from pathlib import Path
 from typing import Optional
 import yaml
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader
+
+# Load environment variables (set SKIP_DOTENV=1 to use the process environment only)
+if os.getenv("SKIP_DOTENV") != "1":
+    load_dotenv()
 
 class Config:
     """Main configuration class."""
@@ -19,10 +26,6 @@ class Config:
     STORAGE_DIR = BASE_DIR / "storage"
     UPLOAD_DIR = STORAGE_DIR / "uploads"
     
-    # Create necessary directories
-    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
-    
     # LLM Configuration
     LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
     LLM_MODEL = os.getenv("LLM_MODEL", "gemini-1.5-pro")
@@ -32,6 +35,7 @@ class Config:
     # Vector DB Configuration
     VECTOR_DB_TYPE = os.getenv("VECTOR_DB_TYPE", "qdrant")
     QDRANT_PATH = os.getenv("QDRANT_PATH", str(STORAGE_DIR / "qdrant_storage"))
+    QDRANT_INT8_QUANTIZATION = os.getenv("QDRANT_INT8_QUANTIZATION", "true").lower() == "true"
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     
     # Web Search Configuration
@@ -40,6 +44,9 @@ class Config:
     
     # Application Settings
     PORT = int(os.getenv("PORT", 8000))
+    # API server processes; the embedded Qdrant store (QDRANT_PATH) can only be
+    # opened by one process, so raise this only with a Qdrant server
+    WORKERS = int(os.getenv("WORKERS", 1))
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
     DEBUG = os.getenv("DEBUG", "false").lower() == "true"
     
@@ -48,18 +55,35 @@ class Config:
     CHUNK_OVERLAP = int(os.getenv("CHUNK_OVERLAP", 200))
     RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", 5))
     
+    # Semantic answer cache
+    SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "false").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+    SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", 3600))
+    SEMANTIC_CACHE_FLOAT16 = os.getenv("SEMANTIC_CACHE_FLOAT16", "false").lower() == "true"
+    
+    # Embedding-based evidence dedup in FusionAgent
+    SEMANTIC_DEDUP = os.getenv("SEMANTIC_DEDUP", "false").lower() == "true"
+    SEMANTIC_DEDUP_THRESHOLD = float(os.getenv("SEMANTIC_DEDUP_THRESHOLD", 0.9))
+    
     # CrewAI Settings
     CREW_VERBOSE = os.getenv("CREW_VERBOSE", "true").lower() == "true"
     CREW_MEMORY = os.getenv("CREW_MEMORY", "true").lower() == "true"
     
     @classmethod
+    @functools.lru_cache(maxsize=1)
     def load_yaml(cls) -> dict:
-        """Load configuration from YAML file."""
+        """Load configuration from YAML file (parsed once, then cached)."""
         if cls.CONFIG_PATH.exists():
             with open(cls.CONFIG_PATH, 'r') as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=SafeLoader)
         return {}
     
+    @classmethod
+    def ensure_dirs(cls) -> None:
+        """Create the storage directories; called by the app entrypoints at startup."""
+        cls.STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+        cls.UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    
     @classmethod
     def validate(cls) -> None:
         """Validate critical configuration."""
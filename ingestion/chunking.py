@@ -1,14 +1,33 @@
 """
 Document chunking and text processing.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 import logging
+import math
+import re
 from dataclasses import dataclass
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# ASCII whitespace bytes (space, \t, \n, \v, \f, \r) separating words in chunk_by_tokens
+_WS_BYTES = np.frombuffer(b" \t\n\v\f\r", dtype=np.uint8)
+
+# Paragraph break: a blank line, allowing trailing spaces/tabs and \r\n line endings
+_PARA_RE = re.compile(r'\n[ \t\r]*\n')
+
 
-@dataclass
+def _iter_paragraphs(text: str):
+    """Yield the text between paragraph breaks, one slice at a time."""
+    prev = 0
+    for m in _PARA_RE.finditer(text):
+        yield text[prev:m.start()]
+        prev = m.end()
+    yield text[prev:]
+
+
+@dataclass(slots=True, frozen=True)
 class TextChunk:
     """Represents a chunk of text with metadata."""
     content: str
@@ -21,15 +40,17 @@ class DocumentChunker:
     """Handle document chunking strategies."""
     
     @staticmethod
-    def chunk_text(
+    def chunk_text_iter(
         text: str,
         chunk_size: int = 1024,
         chunk_overlap: int = 200,
         document_id: str = "",
-        source: str = ""
-    ) -> List[TextChunk]:
+        source: str = "",
+        first_index: int = 0,
+        position_offset: int = 0,
+    ) -> Iterator[TextChunk]:
         """
-        Chunk text into overlapping segments.
+        Chunk text into overlapping segments, yielding chunks as they are cut.
         
         Args:
             text: Text to chunk
@@ -37,52 +58,89 @@ class DocumentChunker:
             chunk_overlap: Overlap between chunks
             document_id: ID of source document
             source: Source document path/name
+            first_index: Index of the first chunk, for text that continues
+                an earlier block of the same document
+            position_offset: Position of text[0] within the whole document
             
-        Returns:
-            List of TextChunk objects
+        Yields:
+            TextChunk objects
         """
         if chunk_overlap >= chunk_size:
             raise ValueError("chunk_overlap must be less than chunk_size")
         
-        chunks = []
+        n = len(text)
+        # A sentence boundary is only used if the next chunk still starts past this one
+        min_cut = max(chunk_overlap, 1)
+        spans = []
         start = 0
-        chunk_counter = 0
         
-        while start < len(text):
-            # Get chunk end position
-            end = min(start + chunk_size, len(text))
+        # Main phase: every window ends before the end of the text, so try to
+        # end each one at a sentence boundary
+        while start + chunk_size < n:
+            end = start + chunk_size
+            # Look for last sentence boundary; a newline only matters if it
+            # falls after the last period, so the second scan stops there
+            last_period = text.rfind('.', start, end)
+            last_newline = text.rfind('\n', max(last_period, start), end)
+            last_boundary = max(last_period, last_newline)
             
-            # Try to end at sentence boundary if not at end of text
-            if end < len(text):
-                # Look for last sentence boundary
-                last_period = text.rfind('.', start, end)
-                last_newline = text.rfind('\n', start, end)
-                last_boundary = max(last_period, last_newline)
-                
-                if last_boundary > start:
-                    end = last_boundary + 1
+            if last_boundary >= start + min_cut:
+                end = last_boundary + 1
+            spans.append((start, end))
             
-            chunk_content = text[start:end].strip()
+            # Move to next chunk with overlap
+            start = end - chunk_overlap
+        
+        # Tail: the remainder of the text is the final chunk
+        if start < n:
+            spans.append((start, n))
+        
+        chunk_counter = first_index
+        id_prefix = f"{document_id}_chunk_"
+        for start, end in spans:
+            # Trim surrounding whitespace by moving the offsets, so the
+            # content is a single slice of text
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
             
-            if chunk_content:  # Only add non-empty chunks
-                chunk = TextChunk(
-                    content=chunk_content,
+            if start < end:  # Only add non-empty chunks
+                yield TextChunk(
+                    content=text[start:end],
                     metadata={
                         "document_id": document_id,
                         "source": source,
                         "chunk_index": chunk_counter,
-                        "start_position": start,
-                        "end_position": end,
+                        "start_position": position_offset + start,
+                        "end_position": position_offset + end,
                     },
-                    chunk_id=f"{document_id}_chunk_{chunk_counter}",
+                    chunk_id=id_prefix + str(chunk_counter),
                     source=source,
                 )
-                chunks.append(chunk)
                 chunk_counter += 1
-            
-            # Move to next chunk with overlap
-            start = end - chunk_overlap
+    
+    @staticmethod
+    def chunk_text(
+        text: str,
+        chunk_size: int = 1024,
+        chunk_overlap: int = 200,
+        document_id: str = "",
+        source: str = "",
+        first_index: int = 0,
+        position_offset: int = 0,
+    ) -> List[TextChunk]:
+        """
+        Chunk text into overlapping segments.
         
+        Same arguments as chunk_text_iter.
+            
+        Returns:
+            List of TextChunk objects
+        """
+        chunks = list(DocumentChunker.chunk_text_iter(
+            text, chunk_size, chunk_overlap, document_id, source, first_index, position_offset,
+        ))
         logger.info(f"Created {len(chunks)} chunks from {source}")
         return chunks
     
@@ -104,11 +162,10 @@ class DocumentChunker:
             List of TextChunk objects
         """
         chunks = []
+        id_prefix = f"{document_id}_section_"
         
-        # Split by double newlines (paragraphs)
-        paragraphs = text.split('\n\n')
-        
-        for idx, para in enumerate(paragraphs):
+        # Split on blank lines (paragraphs)
+        for idx, para in enumerate(_iter_paragraphs(text)):
             para = para.strip()
             if para:
                 chunk = TextChunk(
@@ -118,7 +175,7 @@ class DocumentChunker:
                         "source": source,
                         "chunk_index": idx,
                     },
-                    chunk_id=f"{document_id}_section_{idx}",
+                    chunk_id=id_prefix + str(idx),
                     source=source,
                 )
                 chunks.append(chunk)
@@ -145,48 +202,33 @@ class DocumentChunker:
         Returns:
             List of TextChunk objects
         """
-        chunks = []
-        words = text.split()
-        chunk_words = []
-        chunk_counter = 0
-        
-        for word in words:
-            chunk_words.append(word)
-            
-            # Estimate tokens (rough: words * 1.3)
-            if len(chunk_words) >= max_tokens / 1.3:
-                content = ' '.join(chunk_words).strip()
-                if content:
-                    chunk = TextChunk(
-                        content=content,
-                        metadata={
-                            "document_id": document_id,
-                            "source": source,
-                            "chunk_index": chunk_counter,
-                            "word_count": len(chunk_words),
-                        },
-                        chunk_id=f"{document_id}_token_chunk_{chunk_counter}",
-                        source=source,
-                    )
-                    chunks.append(chunk)
-                    chunk_counter += 1
-                chunk_words = []
-        
-        # Add remaining words
-        if chunk_words:
-            content = ' '.join(chunk_words).strip()
-            chunk = TextChunk(
-                content=content,
+        # Locate word boundaries in one vectorized pass over the UTF-8 bytes.
+        # Multi-byte characters never contain ASCII bytes, so byte offsets at
+        # word boundaries are always valid places to slice.
+        data = text.encode('utf-8')
+        is_ws = np.isin(np.frombuffer(data, dtype=np.uint8), _WS_BYTES)
+        is_word = ~is_ws
+        word_starts = np.flatnonzero(is_word & np.concatenate(([True], is_ws[:-1])))
+        word_ends = np.flatnonzero(is_word & np.concatenate((is_ws[1:], [True]))) + 1
+        n_words = len(word_starts)
+
+        # Estimate tokens (rough: words * 1.3)
+        target = max(1, math.ceil(max_tokens / 1.3))
+        id_prefix = f"{document_id}_token_chunk_"
+        chunks = [
+            TextChunk(
+                content=data[word_starts[i]:word_ends[min(i + target, n_words) - 1]].decode('utf-8'),
                 metadata={
                     "document_id": document_id,
                     "source": source,
                     "chunk_index": chunk_counter,
-                    "word_count": len(chunk_words),
+                    "word_count": min(target, n_words - i),
                 },
-                chunk_id=f"{document_id}_token_chunk_{chunk_counter}",
+                chunk_id=id_prefix + str(chunk_counter),
                 source=source,
             )
-            chunks.append(chunk)
+            for chunk_counter, i in enumerate(range(0, n_words, target))
+        ]
         
         logger.info(f"Created {len(chunks)} token-based chunks from {source}")
         return chunks
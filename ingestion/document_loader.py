@@ -1,13 +1,128 @@
 """
 Document loading and processing utilities.
 """
+import mmap
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Threads used by load_multiple to read files concurrently
+LOAD_WORKERS = 8
+
+# CSVs are rendered in blocks: ~4 MiB of input per pyarrow batch, or this
+# many rows per block with the csv module
+CSV_BLOCK_SIZE = 4 * 1024 * 1024
+CSV_ROWS_PER_BLOCK = 10_000
+
+# PDFs with at least this many pages are extracted across worker processes
+# (PyPDF2 text extraction is pure Python and holds the GIL)
+PDF_PARALLEL_MIN_PAGES = 64
+# Minimum pages handed to each worker process
+PDF_PAGES_PER_WORKER = 32
+
+
+def _iter_csv_arrow(file_path: str) -> Iterator[Tuple[int, str]]:
+    """Render CSV rows as 'col: value | ...' lines with pyarrow's streaming reader.
+
+    Yields (row_count, text) per record batch of about CSV_BLOCK_SIZE bytes.
+    Every column is read as a string so values keep their exact text.
+    Raises ImportError if pyarrow is not installed.
+    """
+    import csv
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        return
+    if len(set(header)) != len(header):
+        raise ValueError("duplicate column names")
+    reader = pacsv.open_csv(
+        file_path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(column_types={name: pa.string() for name in header}),
+    )
+    for batch in reader:
+        if batch.num_rows == 0:
+            continue
+        fields = [pc.binary_join_element_wise(f"{name}: ", column, "") for name, column in zip(header, batch.columns)]
+        rows = pc.binary_join_element_wise(*fields, " | ")
+        yield batch.num_rows, "\n".join(rows.to_pylist()) + "\n"
+
+
+def _iter_csv_rows(file_path: str, skip_rows: int = 0) -> Iterator[str]:
+    """Render CSV rows with the csv module, CSV_ROWS_PER_BLOCK rows per yielded block.
+
+    Rows are read as lists and matched to the header by position, giving
+    the same output csv.DictReader rows would: a repeated column name keeps
+    its last value, missing values render as None and extra values are
+    listed under None.
+    """
+    import csv
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        last_index = {name: i for i, name in enumerate(header)}
+        labels = [f"{name}: " for name in last_index]
+        indexes = list(last_index.values())
+        n_fields = len(header)
+        # DictReader skips blank lines, and so does the pyarrow row count
+        rows = islice((row for row in reader if row), skip_rows, None)
+        while True:
+            block = "".join(
+                _render_csv_row(labels, indexes, n_fields, row) + "\n"
+                for row in islice(rows, CSV_ROWS_PER_BLOCK)
+            )
+            if not block:
+                return
+            yield block
+
+
+def _render_csv_row(labels: List[str], indexes: List[int], n_fields: int, row: List[str]) -> str:
+    """Render one csv.reader row as 'col: value | ...'."""
+    if len(row) == n_fields:
+        return " | ".join([label + row[i] for label, i in zip(labels, indexes)])
+    parts = [label + (row[i] if i < len(row) else "None") for label, i in zip(labels, indexes)]
+    if len(row) > n_fields:
+        parts.append(f"None: {row[n_fields:]}")
+    return " | ".join(parts)
+
+
+def _extract_pdf_pages(file_path: str, start: int, stop: int) -> List[str]:
+    """Extract text for pages [start, stop) of a PDF; runs in a worker process."""
+    import PyPDF2
+    with open(file_path, 'rb') as f:
+        reader = PyPDF2.PdfReader(f)
+        return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def _read_text(file_path: str) -> str:
+    """Decode a UTF-8 text file through a read-only memory map.
+
+    The file bytes stay in the page cache instead of a heap copy that lives
+    alongside the decoded string. Line endings are normalized to '\n' as
+    text-mode reads do.
+    """
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = str(mm, 'utf-8')
+            has_cr = mm.find(b'\r') != -1
+    if has_cr:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
 
 class DocumentLoader:
     """Handle multi-format document loading."""
@@ -20,17 +135,30 @@ class DocumentLoader:
         '.md': 'load_markdown',
     }
     
+    # Formats that can also be read incrementally as blocks of text
+    STREAMING_FORMATS = {
+        '.csv': 'iter_csv',
+    }
+    
     @staticmethod
     def load_pdf(file_path: str) -> str:
         """Load PDF file."""
         try:
             import PyPDF2
-            text = ""
             with open(file_path, 'rb') as f:
                 reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text()
-            return text
+                n_pages = len(reader.pages)
+                workers = min(os.cpu_count() or 1, n_pages // PDF_PAGES_PER_WORKER)
+                if n_pages < PDF_PARALLEL_MIN_PAGES or workers < 2:
+                    return "\n".join(page.extract_text() or "" for page in reader.pages)
+            
+            # Large PDF: each worker reopens the file and extracts a contiguous page range
+            step = -(-n_pages // workers)
+            starts = range(0, n_pages, step)
+            stops = [min(start + step, n_pages) for start in starts]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(_extract_pdf_pages, repeat(file_path), starts, stops)
+                return "\n".join(text for part in parts for text in part)
         except Exception as e:
             logger.error(f"Error loading PDF {file_path}: {e}")
             raise
@@ -51,23 +179,37 @@ class DocumentLoader:
     def load_txt(file_path: str) -> str:
         """Load plain text file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_text(file_path)
         except Exception as e:
             logger.error(f"Error loading TXT {file_path}: {e}")
             raise
     
+    @staticmethod
+    def iter_csv(file_path: str) -> Iterator[str]:
+        """Stream a CSV file as blocks of 'col: value | ...' lines.
+        
+        Each block holds whole rows, so memory stays bounded by the block
+        size rather than the file. Uses pyarrow when installed, otherwise
+        (or for files pyarrow rejects, such as ragged rows or duplicate
+        headers) the csv module, resuming after any rows already yielded.
+        """
+        emitted = 0
+        try:
+            for n_rows, block in _iter_csv_arrow(file_path):
+                yield block
+                emitted += n_rows
+            return
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.debug(f"pyarrow CSV read failed for {file_path}, using csv module: {e}")
+        yield from _iter_csv_rows(file_path, skip_rows=emitted)
+    
     @staticmethod
     def load_csv(file_path: str) -> str:
         """Load CSV file."""
         try:
-            import csv
-            text = ""
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    text += " | ".join([f"{k}: {v}" for k, v in row.items()]) + "\n"
-            return text
+            return "".join(DocumentLoader.iter_csv(file_path))
         except Exception as e:
             logger.error(f"Error loading CSV {file_path}: {e}")
             raise
@@ -76,19 +218,20 @@ class DocumentLoader:
     def load_markdown(file_path: str) -> str:
         """Load Markdown file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_text(file_path)
         except Exception as e:
             logger.error(f"Error loading Markdown {file_path}: {e}")
             raise
     
     @classmethod
-    def load(cls, file_path: str) -> Dict[str, Any]:
+    def load(cls, file_path: str, stream: bool = False) -> Dict[str, Any]:
         """
         Load document from file path.
         
         Args:
             file_path: Path to document file
+            stream: For STREAMING_FORMATS, return content as an iterator of
+                text blocks instead of one string
             
         Returns:
             Dictionary with document metadata and content
@@ -99,7 +242,10 @@ class DocumentLoader:
         if file_ext not in cls.SUPPORTED_FORMATS:
             raise ValueError(f"Unsupported file format: {file_ext}")
         
-        loader_method = getattr(cls, cls.SUPPORTED_FORMATS[file_ext])
+        if stream and file_ext in cls.STREAMING_FORMATS:
+            loader_method = getattr(cls, cls.STREAMING_FORMATS[file_ext])
+        else:
+            loader_method = getattr(cls, cls.SUPPORTED_FORMATS[file_ext])
         content = loader_method(file_path)
         
         return {
@@ -110,19 +256,30 @@ class DocumentLoader:
             "file_size": path.stat().st_size,
         }
     
+    @classmethod
+    def supported_files(cls, directory: str) -> List[str]:
+        """List paths of regular files in directory with a supported extension."""
+        paths = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                name = entry.name
+                if name[name.rfind('.'):].lower() in cls.SUPPORTED_FORMATS and entry.is_file():
+                    paths.append(entry.path)
+        return paths
+    
+    @classmethod
+    def _try_load(cls, file_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            doc = cls.load(file_path)
+            logger.info(f"Loaded: {doc['filename']}")
+            return doc
+        except Exception as e:
+            logger.warning(f"Failed to load {os.path.basename(file_path)}: {e}")
+            return None
+    
     @classmethod
     def load_multiple(cls, directory: str) -> List[Dict[str, Any]]:
-        """Load multiple documents from directory."""
-        documents = []
-        path = Path(directory)
-        
-        for file_path in path.glob("*"):
-            if file_path.suffix.lower() in cls.SUPPORTED_FORMATS:
-                try:
-                    doc = cls.load(str(file_path))
-                    documents.append(doc)
-                    logger.info(f"Loaded: {file_path.name}")
-                except Exception as e:
-                    logger.warning(f"Failed to load {file_path.name}: {e}")
-        
-        return documents
+        """Load multiple documents from directory, reading files on a thread pool."""
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+            loaded = pool.map(cls._try_load, cls.supported_files(directory))
+            return [doc for doc in loaded if doc is not None]
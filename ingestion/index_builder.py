@@ -2,21 +2,29 @@
 Vector index building and management using LlamaIndex.
 """
 import logging
-from typing import List, Optional, Dict, Any
+from itertools import islice
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Union
 from pathlib import Path
 import json
 
+import google.generativeai as genai
 from llama_index.core import Document, VectorStoreIndex, SimpleDirectoryReader
-from llama_index.core.schema import TextNode, BaseNode
+from llama_index.core.schema import TextNode, BaseNode, MetadataMode
 from llama_index.embeddings.gemini import GeminiEmbedding
 from llama_index.vector_stores.qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
+from qdrant_client import QdrantClient, models
 
 from config import config
 from ingestion.chunking import DocumentChunker, TextChunk
 
 logger = logging.getLogger(__name__)
 
+# Length of the content preview returned with query sources
+PREVIEW_CHARS = 200
+
+# Chunks embedded and inserted per step in add_document (one Gemini batch request)
+EMBED_BATCH_SIZE = 100
+
 
 class IndexBuilder:
     """Build and manage vector indices using LlamaIndex."""
@@ -28,6 +36,12 @@ class IndexBuilder:
             api_key=config.GEMINI_API_KEY,
         )
         self.vector_store = self._init_vector_store()
+        # Rescore int8 candidates with the original float vectors at query time
+        self.vector_store_kwargs = {}
+        if config.QDRANT_INT8_QUANTIZATION:
+            self.vector_store_kwargs["search_params"] = models.SearchParams(
+                quantization=models.QuantizationSearchParams(rescore=True, oversampling=2.0),
+            )
         self.index = None
     
     def _init_vector_store(self):
@@ -35,9 +49,21 @@ class IndexBuilder:
         if config.VECTOR_DB_TYPE == "qdrant":
             # Create Qdrant client
             client = QdrantClient(path=config.QDRANT_PATH)
+            # int8 scalar quantization keeps a 4x smaller copy of each vector
+            # for scoring; applied when the collection is created
+            quantization_config = None
+            if config.QDRANT_INT8_QUANTIZATION:
+                quantization_config = models.ScalarQuantization(
+                    scalar=models.ScalarQuantizationConfig(
+                        type=models.ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True,
+                    ),
+                )
             vector_store = QdrantVectorStore(
                 client=client,
-                collection_name="documents"
+                collection_name="documents",
+                quantization_config=quantization_config,
             )
             logger.info(f"Initialized Qdrant vector store at {config.QDRANT_PATH}")
             return vector_store
@@ -46,7 +72,7 @@ class IndexBuilder:
     
     def add_document(
         self,
-        document_content: str,
+        document_content: Union[str, Iterable[str]],
         document_id: str,
         source: str,
         metadata: Optional[Dict[str, Any]] = None
@@ -55,7 +81,9 @@ class IndexBuilder:
         Add a single document to the index.
         
         Args:
-            document_content: The document text
+            document_content: The document text, or an iterable of text
+                blocks (e.g. DocumentLoader.iter_csv) that are chunked,
+                embedded and inserted one block at a time
             document_id: Unique identifier for the document
             source: Source file name/path
             metadata: Additional metadata
@@ -63,33 +91,21 @@ class IndexBuilder:
         Returns:
             Document ID
         """
-        # Chunk the document
-        chunks = DocumentChunker.chunk_text(
-            text=document_content,
-            chunk_size=config.CHUNK_SIZE,
-            chunk_overlap=config.CHUNK_OVERLAP,
-            document_id=document_id,
-            source=source,
-        )
-        
-        # Convert chunks to LlamaIndex nodes
-        nodes = self._chunks_to_nodes(chunks, metadata or {})
+        blocks = (document_content,) if isinstance(document_content, str) else document_content
+        n_nodes = 0
+        offset = 0
+        for block in blocks:
+            # Chunks are cut, embedded and inserted EMBED_BATCH_SIZE at a time,
+            # so only one batch of chunks and nodes is held at once
+            chunks = self._iter_chunks(block, document_id, source, first_index=n_nodes, position_offset=offset)
+            while batch := list(islice(chunks, EMBED_BATCH_SIZE)):
+                nodes = self._chunks_to_nodes(batch, metadata or {})
+                self._embed_nodes(nodes)
+                self._insert_nodes(nodes)
+                n_nodes += len(nodes)
+            offset += len(block)
         
-        # Add to index
-        if self.index is None:
-            from llama_index.core import StorageContext, VectorStoreIndex
-            storage_context = StorageContext.from_defaults(
-                vector_store=self.vector_store
-            )
-            self.index = VectorStoreIndex(
-                nodes=nodes,
-                storage_context=storage_context,
-                embed_model=self.embedding_model,
-            )
-        else:
-            self.index.insert_nodes(nodes)
-        
-        logger.info(f"Added document {document_id} with {len(nodes)} nodes")
+        logger.info(f"Added document {document_id} with {n_nodes} nodes")
         return document_id
     
     def add_documents_batch(
@@ -99,27 +115,114 @@ class IndexBuilder:
         """
         Add multiple documents to the index.
         
+        Chunks from all documents are embedded together, so requests are
+        filled up to the Gemini batch limit rather than once per document,
+        and inserted into the index in one call.
+        
         Args:
             documents: List of document dicts with 'content', 'id', 'source'
             
         Returns:
             List of document IDs
         """
-        doc_ids = []
+        prepared = []
         for doc in documents:
             try:
-                doc_id = self.add_document(
-                    document_content=doc['content'],
-                    document_id=doc.get('id', Path(doc['source']).stem),
-                    source=doc['source'],
-                    metadata=doc.get('metadata', {})
-                )
-                doc_ids.append(doc_id)
+                doc_id = doc.get('id', Path(doc['source']).stem)
+                nodes = self._document_nodes(doc['content'], doc_id, doc['source'], doc.get('metadata', {}))
+                prepared.append((doc_id, doc['source'], nodes))
             except Exception as e:
                 logger.error(f"Failed to add document {doc['source']}: {e}")
         
+        all_nodes = [node for _, _, nodes in prepared for node in nodes]
+        self._embed_nodes(all_nodes)
+        try:
+            self._insert_nodes(all_nodes)
+            doc_ids = [doc_id for doc_id, _, _ in prepared]
+        except Exception as e:
+            # Retry per document so one bad document does not drop the batch
+            logger.warning(f"Batch insert failed, inserting documents one by one: {e}")
+            doc_ids = []
+            for doc_id, source, nodes in prepared:
+                try:
+                    self._insert_nodes(nodes)
+                    doc_ids.append(doc_id)
+                except Exception as e:
+                    logger.error(f"Failed to add document {source}: {e}")
+        
+        logger.info(f"Added {len(doc_ids)} documents with {len(all_nodes)} nodes")
         return doc_ids
     
+    def _document_nodes(
+        self,
+        document_content: str,
+        document_id: str,
+        source: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        first_index: int = 0,
+        position_offset: int = 0,
+    ) -> List[BaseNode]:
+        """Chunk a document and convert the chunks to LlamaIndex nodes."""
+        chunks = list(self._iter_chunks(document_content, document_id, source, first_index, position_offset))
+        return self._chunks_to_nodes(chunks, metadata or {})
+    
+    def _iter_chunks(
+        self,
+        document_content: str,
+        document_id: str,
+        source: str,
+        first_index: int = 0,
+        position_offset: int = 0,
+    ) -> Iterator[TextChunk]:
+        """Lazily chunk a document with the configured chunk size and overlap."""
+        return DocumentChunker.chunk_text_iter(
+            text=document_content,
+            chunk_size=config.CHUNK_SIZE,
+            chunk_overlap=config.CHUNK_OVERLAP,
+            document_id=document_id,
+            source=source,
+            first_index=first_index,
+            position_offset=position_offset,
+        )
+    
+    def _insert_nodes(self, nodes: List[BaseNode]) -> None:
+        """Add nodes to the index, creating it on first use."""
+        if self.index is None:
+            from llama_index.core import StorageContext, VectorStoreIndex
+            storage_context = StorageContext.from_defaults(
+                vector_store=self.vector_store
+            )
+            self.index = VectorStoreIndex(
+                nodes=nodes,
+                storage_context=storage_context,
+                embed_model=self.embedding_model,
+            )
+        else:
+            self.index.insert_nodes(nodes)
+    
+    def _embed_nodes(self, nodes: List[BaseNode]) -> None:
+        """Precompute node embeddings with batched Gemini requests.
+        
+        GeminiEmbedding's sync batch path issues one request per text; the
+        Gemini SDK batches a list of contents into requests of up to 100.
+        Nodes that already carry an embedding are skipped by the index. On
+        failure the embeddings are left unset and the index embeds them itself.
+        """
+        if not nodes:
+            return
+        texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in nodes]
+        try:
+            vectors = genai.embed_content(
+                model=self.embedding_model.model_name,
+                content=texts,
+                task_type=self.embedding_model.task_type,
+            )["embedding"]
+        except Exception as e:
+            logger.warning(f"Batched embedding failed, falling back to per-node embedding: {e}")
+            return
+        for node, vector in zip(nodes, vectors):
+            node.embedding = vector
+    
     def _chunks_to_nodes(
         self,
         chunks: List[TextChunk],
@@ -130,11 +233,15 @@ class IndexBuilder:
         
         for chunk in chunks:
             metadata = {**base_metadata, **chunk.metadata}
+            # Stored at ingestion so source listings never re-read the full text
+            metadata["_preview"] = chunk.content[:PREVIEW_CHARS]
             
             node = TextNode(
                 text=chunk.content,
                 metadata=metadata,
                 id_=chunk.chunk_id,
+                excluded_embed_metadata_keys=["_preview"],
+                excluded_llm_metadata_keys=["_preview"],
             )
             nodes.append(node)
         
@@ -167,6 +274,7 @@ class IndexBuilder:
         retriever = self.index.as_retriever(
             similarity_top_k=top_k,
             embed_model=self.embedding_model,
+            vector_store_kwargs=self.vector_store_kwargs,
         )
         
         # Retrieve nodes
@@ -206,6 +314,7 @@ class IndexBuilder:
         query_engine = self.index.as_query_engine(
             top_k=top_k or config.RETRIEVAL_TOP_K,
             embed_model=self.embedding_model,
+            vector_store_kwargs=self.vector_store_kwargs,
         )
         
         response = query_engine.query(query)
@@ -220,9 +329,12 @@ class IndexBuilder:
         sources = []
         if hasattr(response, 'source_nodes'):
             for node in response.source_nodes:
+                preview = node.metadata.get('_preview')
+                if preview is None:  # indexed before previews were stored
+                    preview = node.get_content()[:PREVIEW_CHARS]
                 sources.append({
                     "source": node.metadata.get('source', 'unknown'),
-                    "content_preview": node.get_content()[:200],
+                    "content_preview": preview,
                 })
         return sources
     
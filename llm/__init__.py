@@ -5,6 +5,7 @@ from llm.base import BaseLLM
 from llm.gemini import GeminiLLM
 from llm.openrouter import OpenRouterLLM
 from llm.factory import LLMFactory, get_llm, set_llm
+from llm.semantic_cache import CacheConfig, SemanticCache
 
 __all__ = [
     "BaseLLM",
@@ -13,4 +14,6 @@ __all__ = [
     "LLMFactory",
     "get_llm",
     "set_llm",
+    "CacheConfig",
+    "SemanticCache",
 ]
@@ -60,6 +60,21 @@ class BaseLLM(ABC):
         """
         pass
     
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts.
+        
+        Providers with a batch endpoint should override this; the default
+        embeds each text separately.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            One embedding vector per text
+        """
+        return [self.embed(text) for text in texts]
+    
     @abstractmethod
     def stream_complete(self, prompt: str):
         """
@@ -73,6 +88,21 @@ class BaseLLM(ABC):
         """
         pass
     
+    def collect(self, prompt: str) -> str:
+        """
+        Stream a completion and return the full text.
+        
+        Chunks are gathered in a list and joined once, rather than
+        concatenated one at a time.
+        
+        Args:
+            prompt: Input prompt
+            
+        Returns:
+            Generated text
+        """
+        return "".join(self.stream_complete(prompt))
+    
     def get_config(self) -> Dict[str, Any]:
         """Get LLM configuration."""
         return {
@@ -51,8 +51,10 @@ class LLMFactory:
                 max_tokens=max_tokens,
             )
         elif provider.lower() == "openrouter":
+            # OPENROUTER_API_KEY may list several comma-separated keys
+            keys = [k.strip() for k in (config.OPENROUTER_API_KEY or "").split(",") if k.strip()]
             return OpenRouterLLM(
-                api_key=config.OPENROUTER_API_KEY,
+                api_key=keys or config.OPENROUTER_API_KEY,
                 model=model,
                 temperature=temperature,
                 max_tokens=max_tokens,
@@ -2,6 +2,8 @@
 Google Gemini LLM provider implementation.
 """
 import logging
+import threading
+from collections import OrderedDict
 from typing import Optional, List, Dict, Any
 
 import google.generativeai as genai
@@ -9,10 +11,16 @@ from llm.base import BaseLLM
 
 logger = logging.getLogger(__name__)
 
+# Gemini history only has user and model turns; other roles are sent as model turns
+_ROLE_MAP = {"user": "user", "assistant": "model", "model": "model", "system": "model"}
+
 
 class GeminiLLM(BaseLLM):
     """Google Gemini LLM implementation."""
     
+    # Chat sessions kept for `chat(..., session_id=...)`; least recently used are dropped
+    MAX_CHAT_SESSIONS = 128
+    
     def __init__(
         self,
         api_key: str,
@@ -39,6 +47,8 @@ class GeminiLLM(BaseLLM):
                 top_p=0.95,
             ),
         )
+        self._chat_sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._sessions_lock = threading.Lock()
         logger.info(f"Initialized Gemini LLM with model: {model}")
     
     def complete(self, prompt: str) -> str:
@@ -58,27 +68,31 @@ class GeminiLLM(BaseLLM):
             logger.error(f"Error in Gemini completion: {e}")
             raise
     
-    def chat(self, messages: List[Dict[str, str]]) -> str:
+    def chat(self, messages: List[Dict[str, str]], session_id: Optional[str] = None) -> str:
         """
         Chat completion with message history.
         
         Args:
             messages: List of message dicts with 'role' and 'content'
+            session_id: Optional conversation id. The first call starts a
+                session from the history in `messages`; later calls with the
+                same id only send the last message, as the session already
+                holds the earlier turns.
             
         Returns:
             Generated response
         """
         try:
-            # Convert messages to Gemini format
-            chat_history = []
-            for msg in messages[:-1]:  # All but last are history
-                chat_history.append({
-                    "role": "user" if msg["role"] == "user" else "model",
-                    "parts": [msg["content"]],
-                })
-            
-            # Start chat session
-            chat = self.client.start_chat(history=chat_history)
+            chat = self._get_session(session_id) if session_id is not None else None
+            if chat is None:
+                # Convert messages to Gemini format; all but last are history
+                chat_history = [
+                    {"role": _ROLE_MAP.get(msg["role"], "model"), "parts": [msg["content"]]}
+                    for msg in messages[:-1]
+                ]
+                chat = self.client.start_chat(history=chat_history)
+                if session_id is not None:
+                    self._store_session(session_id, chat)
             
             # Send the last message
             response = chat.send_message(messages[-1]["content"])
@@ -87,6 +101,24 @@ class GeminiLLM(BaseLLM):
             logger.error(f"Error in Gemini chat: {e}")
             raise
     
+    def _get_session(self, session_id: str):
+        with self._sessions_lock:
+            chat = self._chat_sessions.get(session_id)
+            if chat is not None:
+                self._chat_sessions.move_to_end(session_id)
+            return chat
+    
+    def _store_session(self, session_id: str, chat) -> None:
+        with self._sessions_lock:
+            self._chat_sessions[session_id] = chat
+            while len(self._chat_sessions) > self.MAX_CHAT_SESSIONS:
+                self._chat_sessions.popitem(last=False)
+    
+    def end_session(self, session_id: str) -> None:
+        """Drop a stored chat session."""
+        with self._sessions_lock:
+            self._chat_sessions.pop(session_id, None)
+    
     def embed(self, text: str) -> List[float]:
         """
         Generate embeddings using Gemini Embedding API.
@@ -107,6 +139,28 @@ class GeminiLLM(BaseLLM):
             logger.error(f"Error in Gemini embedding: {e}")
             raise
     
+    def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in a single Gemini API call.
+        
+        Args:
+            texts: Input texts
+            
+        Returns:
+            One embedding vector per text
+        """
+        if not texts:
+            return []
+        try:
+            response = genai.embed_content(
+                model="models/embedding-001",
+                content=list(texts),
+            )
+            return response["embedding"]
+        except Exception as e:
+            logger.error(f"Error in Gemini batch embedding: {e}")
+            raise
+    
     def stream_complete(self, prompt: str):
         """
         Stream completion for a prompt.
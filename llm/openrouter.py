@@ -1,18 +1,56 @@
 """
 OpenRouter LLM provider implementation for multi-model support.
 """
+import itertools
 import logging
-from typing import Optional, List, Dict, Any
+import threading
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Sequence, Tuple, Union
 
+import httpx
+import openai
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_openai import ChatOpenAI
+from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential_jitter
 from llm.base import BaseLLM
 
 logger = logging.getLogger(__name__)
 
+# Connection pool shared by the chat and embeddings clients, so repeated
+# calls reuse open TLS connections to openrouter.ai
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+# LangChain message class per chat role; messages with other roles are skipped
+_ROLE_MAP = {"system": SystemMessage, "user": HumanMessage, "assistant": AIMessage}
+
+# Chat requests are retried on rate limits, server errors and connection
+# failures with jittered exponential backoff; other errors are raised at once.
+# The OpenAI SDK's own retries are disabled on the chat client so attempts
+# do not multiply.
+_retry_transient = retry(
+    stop=stop_after_attempt(4),
+    wait=wait_exponential_jitter(initial=0.5, max=8),
+    retry=retry_if_exception_type((
+        openai.RateLimitError,
+        openai.InternalServerError,
+        openai.APIConnectionError,
+        httpx.TimeoutException,
+    )),
+    reraise=True,
+)
+
 
 class OpenRouterLLM(BaseLLM):
     """OpenRouter LLM implementation supporting multiple models."""
     
+    # Embeddings kept by `embed`, keyed by text; least recently used are dropped
+    EMBED_CACHE_SIZE = 1024
+    
+    # Fallback embedding when the endpoint fails; one shared immutable
+    # vector, so callers must not modify what embed returns
+    _ZERO_EMB: Tuple[float, ...] = (0.0,) * 1536
+    
     SUPPORTED_MODELS = {
         "gpt-4-turbo": "openai/gpt-4-turbo",
         "gpt-4o": "openai/gpt-4o",
@@ -23,7 +61,7 @@ class OpenRouterLLM(BaseLLM):
     
     def __init__(
         self,
-        api_key: str,
+        api_key: Union[str, List[str]],
         model: str = "gpt-4-turbo",
         temperature: float = 0.7,
         max_tokens: int = 2048,
@@ -32,7 +70,8 @@ class OpenRouterLLM(BaseLLM):
         Initialize OpenRouter LLM.
         
         Args:
-            api_key: OpenRouter API key
+            api_key: OpenRouter API key, or a list of keys; requests are
+                spread across the keys in round-robin order
             model: Model name or OpenRouter model ID
             temperature: Sampling temperature
             max_tokens: Maximum output tokens
@@ -42,15 +81,47 @@ class OpenRouterLLM(BaseLLM):
         # Map model name if using shorthand
         actual_model = self.SUPPORTED_MODELS.get(model, model)
         
-        self.client = ChatOpenAI(
-            model=actual_model,
-            openai_api_key=api_key,
-            openai_api_base="https://openrouter.ai/api/v1",
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
+        api_keys = api_key if isinstance(api_key, (list, tuple)) else [api_key]
+        
+        self.http_client = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+        # One chat client per key, all sharing the connection pool
+        self.clients = [
+            ChatOpenAI(
+                model=actual_model,
+                openai_api_key=key,
+                openai_api_base="https://openrouter.ai/api/v1",
+                temperature=temperature,
+                max_tokens=max_tokens,
+                http_client=self.http_client,
+                max_retries=0,
+            )
+            for key in api_keys
+        ]
+        self.client = self.clients[0]
+        self._rr = itertools.count()
+        # Embeddings client, created on first use and reused afterwards
+        self._embeddings = None
+        self._embed_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._embed_cache_lock = threading.Lock()
         logger.info(f"Initialized OpenRouter LLM with model: {actual_model}")
     
+    def _next_client(self) -> ChatOpenAI:
+        """Pick the chat client (API key) for the next request, round-robin."""
+        return self.clients[next(self._rr) % len(self.clients)]
+    
+    # Each attempt picks the next client, so a retry after a rate limit
+    # goes to another key when several are configured
+    @_retry_transient
+    def _invoke(self, messages):
+        return self._next_client().invoke(messages)
+    
+    @_retry_transient
+    def _open_stream(self, messages):
+        """Start a stream and read its first chunk, so a failed request is
+        retried before any output has been yielded."""
+        response = self._next_client().stream(messages)
+        return next(response, None), response
+    
     def complete(self, prompt: str) -> str:
         """
         Generate completion for a prompt using OpenRouter.
@@ -62,7 +133,7 @@ class OpenRouterLLM(BaseLLM):
             Generated text
         """
         try:
-            response = self.client.invoke(prompt)
+            response = self._invoke(prompt)
             return response.content
         except Exception as e:
             logger.error(f"Error in OpenRouter completion: {e}")
@@ -79,48 +150,104 @@ class OpenRouterLLM(BaseLLM):
             Generated response
         """
         try:
-            from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
-            
             # Convert to LangChain message format
-            lc_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    lc_messages.append(SystemMessage(content=msg["content"]))
-                elif msg["role"] == "user":
-                    lc_messages.append(HumanMessage(content=msg["content"]))
-                elif msg["role"] == "assistant":
-                    lc_messages.append(AIMessage(content=msg["content"]))
+            lc_messages = [
+                _ROLE_MAP[msg["role"]](content=msg["content"])
+                for msg in messages
+                if msg["role"] in _ROLE_MAP
+            ]
             
-            response = self.client.invoke(lc_messages)
+            response = self._invoke(lc_messages)
             return response.content
         except Exception as e:
             logger.error(f"Error in OpenRouter chat: {e}")
             raise
     
-    def embed(self, text: str) -> List[float]:
+    def embed(self, text: str) -> Sequence[float]:
         """
         Generate embeddings (using OpenRouter embedding endpoint or fallback).
         
+        Repeated texts are served from an in-memory cache of recent results.
+        
         Args:
             text: Input text
             
         Returns:
-            Embedding vector
+            Embedding vector (the shared zero vector on failure)
         """
+        with self._embed_cache_lock:
+            cached = self._embed_cache.get(text)
+            if cached is not None:
+                self._embed_cache.move_to_end(text)
+                return cached
         try:
+            result = self._embeddings_client().embed_query(text)
+        except Exception as e:
+            logger.warning(f"Embedding via OpenRouter failed, using fallback: {e}")
+            # Fallback to a mock embedding for demo purposes
+            return self._ZERO_EMB
+        self._cache_embeddings([text], [result])
+        return result
+    
+    def embed_many(self, texts: List[str], batch_size: int = 96) -> List[Sequence[float]]:
+        """
+        Generate embeddings for several texts, batch_size texts per request.
+        
+        Texts already in the embedding cache are not sent.
+        
+        Args:
+            texts: Input texts
+            batch_size: Maximum texts per embeddings request
+            
+        Returns:
+            One embedding vector per text
+        """
+        results: List[Optional[Sequence[float]]] = [None] * len(texts)
+        misses: Dict[str, List[int]] = {}
+        with self._embed_cache_lock:
+            for i, text in enumerate(texts):
+                cached = self._embed_cache.get(text)
+                if cached is not None:
+                    self._embed_cache.move_to_end(text)
+                    results[i] = cached
+                else:
+                    misses.setdefault(text, []).append(i)
+        
+        pending = list(misses)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                vectors = self._embeddings_client().embed_documents(batch)
+            except Exception as e:
+                logger.warning(f"Batch embedding via OpenRouter failed, using fallback: {e}")
+                vectors = [self._ZERO_EMB] * len(batch)
+            else:
+                self._cache_embeddings(batch, vectors)
+            for text, vector in zip(batch, vectors):
+                for i in misses[text]:
+                    results[i] = vector
+        return results
+    
+    def _cache_embeddings(self, texts: List[str], vectors: List[List[float]]) -> None:
+        with self._embed_cache_lock:
+            for text, vector in zip(texts, vectors):
+                self._embed_cache[text] = vector
+                self._embed_cache.move_to_end(text)
+            while len(self._embed_cache) > self.EMBED_CACHE_SIZE:
+                self._embed_cache.popitem(last=False)
+    
+    def _embeddings_client(self):
+        """Return the shared OpenAIEmbeddings client, creating it on first use."""
+        if self._embeddings is None:
             from langchain_openai import OpenAIEmbeddings
             
-            embeddings = OpenAIEmbeddings(
+            self._embeddings = OpenAIEmbeddings(
                 openai_api_key=self.client.openai_api_key,
                 openai_api_base="https://openrouter.ai/api/v1",
                 model="openai/text-embedding-3-small",
+                http_client=self.http_client,
             )
-            result = embeddings.embed_query(text)
-            return result
-        except Exception as e:
-            logger.warning(f"Embedding via OpenRouter failed, using fallback: {e}")
-            # Fallback to a mock embedding for demo purposes
-            return [0.0] * 1536
+        return self._embeddings
     
     def stream_complete(self, prompt: str):
         """
@@ -133,9 +260,9 @@ class OpenRouterLLM(BaseLLM):
             Text chunks
         """
         try:
-            from langchain_core.messages import HumanMessage
-            
-            response = self.client.stream([HumanMessage(content=prompt)])
+            first, response = self._open_stream([HumanMessage(content=prompt)])
+            if first is not None and first.content:
+                yield first.content
             for chunk in response:
                 if chunk.content:
                     yield chunk.content
@@ -0,0 +1,101 @@
+"""
+Semantic response cache keyed by query embedding similarity.
+"""
+from dataclasses import dataclass
+from typing import Any, List, Optional
+import logging
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheConfig:
+    """Settings for SemanticCache."""
+    similarity_threshold: float = 0.92
+    ttl: float = 3600.0
+    max_entries: int = 1024
+    # Storage precision for cached embeddings; float16 halves memory, and
+    # similarities are still computed in float32
+    float16: bool = False
+
+
+class SemanticCache:
+    """In-memory cache returning stored values for near-duplicate query embeddings.
+
+    Entries live in a fixed-size ring buffer; once full, the oldest entry is
+    overwritten. Embeddings are stored normalized, in float16 if configured. A lookup only hits when the stored entry has the same exact
+    `key` (e.g. a hash of the evidence used) and cosine similarity to the
+    query embedding is at least `similarity_threshold`.
+    """
+
+    def __init__(self, config: Optional[CacheConfig] = None):
+        self.config = config or CacheConfig()
+        self._vectors: Optional[np.ndarray] = None
+        self._expires = np.zeros(self.config.max_entries, dtype=np.float64)
+        self._keys: List[Any] = [None] * self.config.max_entries
+        self._values: List[Any] = [None] * self.config.max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding) -> Optional[np.ndarray]:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vec))
+        if vec.ndim != 1 or norm == 0.0:
+            return None
+        return vec / norm
+
+    def get(self, embedding, key: Any = None) -> Optional[Any]:
+        """Return the cached value for the most similar live entry, or None."""
+        vec = self._normalize(embedding)
+        if vec is None:
+            return None
+        with self._lock:
+            if self._size == 0 or self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                return None
+            n = self._size
+            sims = self._vectors[:n].astype(np.float32, copy=False) @ vec
+            live = self._expires[:n] > time.monotonic()
+            live &= np.fromiter((k == key for k in self._keys[:n]), dtype=bool, count=n)
+            if not live.any():
+                return None
+            sims = np.where(live, sims, -np.inf)
+            best = int(np.argmax(sims))
+            if sims[best] < self.config.similarity_threshold:
+                return None
+            logger.debug(f"Semantic cache hit (similarity={sims[best]:.3f})")
+            return self._values[best]
+
+    def put(self, embedding, value: Any, key: Any = None) -> None:
+        """Store value under the given embedding and exact-match key."""
+        vec = self._normalize(embedding)
+        if vec is None:
+            return
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != vec.shape[0]:
+                # First entry (or embedding model changed): (re)allocate storage
+                dtype = np.float16 if self.config.float16 else np.float32
+                self._vectors = np.zeros((self.config.max_entries, vec.shape[0]), dtype=dtype)
+                self._size = 0
+                self._next = 0
+            slot = self._next
+            self._vectors[slot] = vec
+            self._keys[slot] = key
+            self._values[slot] = value
+            self._expires[slot] = time.monotonic() + self.config.ttl
+            self._next = (slot + 1) % self.config.max_entries
+            self._size = min(self._size + 1, self.config.max_entries)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._vectors = None
+            self._keys = [None] * self.config.max_entries
+            self._values = [None] * self.config.max_entries
+            self._size = 0
+            self._next = 0
@@ -16,7 +16,17 @@ from config import config
 
 def run_server():
     import uvicorn
-    uvicorn.run('api.app:app', host='0.0.0.0', port=int(getattr(config, 'PORT', 8000)), reload=True)
+    debug = getattr(config, 'DEBUG', False)
+    # Auto-reload is for development only: it re-imports the app on every file
+    # change and cannot run alongside multiple workers. The event loop and HTTP
+    # parser default to uvloop/httptools when installed (uvicorn[standard]).
+    uvicorn.run(
+        'api.app:app',
+        host='0.0.0.0',
+        port=int(getattr(config, 'PORT', 8000)),
+        reload=debug,
+        workers=1 if debug else int(getattr(config, 'WORKERS', 1)),
+    )
 
 
 def run_ui():
@@ -2,58 +2,110 @@
 Simple orchestrator that wires RouterAgent, DocRAGAgent, WebAgent, FusionAgent, and AnswerAgent.
 
 Provides `run_query(query, metadata)` which returns a structured response with
-decision, evidence, and final answer+citations.
+decision, evidence, and final answer+citations, its async counterpart
+`arun_query(query, metadata)`, `run_queries(queries, metadata)` for many
+queries at once, and `stream_query(query, metadata)`
+which yields the answer text as it is generated before the same response.
 """
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Tuple
+import asyncio
+import functools
 import logging
 
 from agents.router_agent import RouterAgent
-from agents.doc_rag_agent import get_doc_rag_agent
-from agents.web_agent import get_web_agent
-from agents.fusion_agent import get_fusion_agent
-from agents.answer_agent import get_answer_agent
 
 logger = logging.getLogger(__name__)
 
+# Threads for running document retrieval concurrently with web search
+RETRIEVAL_WORKERS = 4
+
+# Router decisions remembered per orchestrator, keyed by normalized query
+ROUTE_CACHE_SIZE = 512
+
 
 class Orchestrator:
     def __init__(self):
         self.router = RouterAgent()
-        self.doc_agent = get_doc_rag_agent()
-        self.web_agent = get_web_agent()
-        self.fusion = get_fusion_agent()
-        self.answer_agent = get_answer_agent()
+        # Runs document retrieval alongside the web search in run_query/stream_query
+        self._retrieval_pool = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix='retrieval')
+        self._route_cache = functools.lru_cache(maxsize=ROUTE_CACHE_SIZE)(self._route)
 
-    def run_query(self, query: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
-        metadata = metadata or {}
-        decision = self.router.decide(query, metadata)
+    # Agents are imported and built on first use, so constructing an
+    # Orchestrator stays cheap and a query only pays for the agents its
+    # route needs (e.g. a web-only query never loads the vector index)
+    @functools.cached_property
+    def doc_agent(self):
+        from agents.doc_rag_agent import get_doc_rag_agent
+        return get_doc_rag_agent()
+
+    @functools.cached_property
+    def web_agent(self):
+        from agents.web_agent import get_web_agent
+        return get_web_agent()
+
+    @functools.cached_property
+    def fusion(self):
+        from agents.fusion_agent import get_fusion_agent
+        return get_fusion_agent()
+
+    @functools.cached_property
+    def answer_agent(self):
+        from agents.answer_agent import get_answer_agent
+        return get_answer_agent()
+
+    def _route(self, query_lower: str, has_docs: bool) -> Dict[str, Any]:
+        return self.router.decide(query_lower, {'has_uploaded_docs': has_docs})
+
+    def _decide(self, query: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        # The router's keyword match is case-insensitive and only reads
+        # has_uploaded_docs from the metadata, so that is the whole cache key
+        decision = self._route_cache(query.lower(), bool(metadata.get('has_uploaded_docs', False)))
+        return dict(decision)
+
+    def _retrieve_documents(self, query: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            # Use retrieve to get passages; if no index, handle gracefully
+            return self.doc_agent.retrieve(query, top_k=metadata.get('top_k'))
+        except Exception as e:
+            logger.warning(f"Document retrieval failed: {e}")
+            return []
+
+    def _search_web(self, query: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
+        try:
+            return self.web_agent.search(query, top_k=metadata.get('top_k', 5))
+        except Exception as e:
+            logger.warning(f"Web retrieval failed: {e}")
+            return []
+
+    def _retrieve_and_fuse(self, query: str, metadata: Dict[str, Any]):
+        decision = self._decide(query, metadata)
 
         doc_results = []
         web_results = []
 
-        # Document retrieval if requested
+        # Document retrieval and web search are independent, so when both are
+        # requested the documents are retrieved on the pool while the web
+        # search runs here
+        doc_future = None
         if decision.get('use_documents'):
-            try:
-                # Use retrieve to get passages; if no index, handle gracefully
-                doc_results = self.doc_agent.retrieve(query, top_k=metadata.get('top_k'))
-            except Exception as e:
-                logger.warning(f"Document retrieval failed: {e}")
-                doc_results = []
-
-        # Web retrieval if requested
+            if decision.get('use_web'):
+                doc_future = self._retrieval_pool.submit(self._retrieve_documents, query, metadata)
+            else:
+                doc_results = self._retrieve_documents(query, metadata)
+
         if decision.get('use_web'):
-            try:
-                web_results = self.web_agent.search(query, top_k=metadata.get('top_k', 5))
-            except Exception as e:
-                logger.warning(f"Web retrieval failed: {e}")
-                web_results = []
+            web_results = self._search_web(query, metadata)
+
+        if doc_future is not None:
+            doc_results = doc_future.result()
 
         # Fuse evidence
         fused = self.fusion.fuse(doc_results=doc_results, web_results=web_results)
+        return decision, doc_results, web_results, fused
 
-        # Generate final answer
-        final = self.answer_agent.generate_answer(fused, user_query=query)
-
+    @staticmethod
+    def _response(decision, doc_results, web_results, fused, final) -> Dict[str, Any]:
         return {
             'decision': decision,
             'doc_count': len(doc_results),
@@ -64,6 +116,73 @@ class Orchestrator:
             'citations': final.get('citations'),
         }
 
+    def run_query(self, query: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        metadata = metadata or {}
+        decision, doc_results, web_results, fused = self._retrieve_and_fuse(query, metadata)
+
+        # Generate final answer
+        final = self.answer_agent.generate_answer(fused, user_query=query)
+
+        return self._response(decision, doc_results, web_results, fused, final)
+
+    def run_queries(self, queries: List[str], metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Answer several queries, e.g. for offline evaluation.
+
+        Routing, retrieval and fusion run concurrently across queries; the
+        answers are then generated with batched LLM requests. Returns one
+        run_query-shaped response per query, in order.
+        """
+        metadata = metadata or {}
+        if not queries:
+            return []
+        # A separate pool: _retrieve_and_fuse itself submits to _retrieval_pool
+        with ThreadPoolExecutor(max_workers=min(len(queries), RETRIEVAL_WORKERS)) as pool:
+            retrieved = list(pool.map(lambda q: self._retrieve_and_fuse(q, metadata), queries))
+
+        finals = self.answer_agent.generate_answers_batched([fused for *_, fused in retrieved], queries)
+        return [self._response(*r, final) for r, final in zip(retrieved, finals)]
+
+    async def arun_query(self, query: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async run_query: retrieval, fusion and answering run in worker threads,
+        with document retrieval and web search awaited together."""
+        metadata = metadata or {}
+        decision = self._decide(query, metadata)
+
+        async def no_results():
+            return []
+
+        doc_results, web_results = await asyncio.gather(
+            asyncio.to_thread(self._retrieve_documents, query, metadata) if decision.get('use_documents') else no_results(),
+            asyncio.to_thread(self._search_web, query, metadata) if decision.get('use_web') else no_results(),
+        )
+
+        fused = await asyncio.to_thread(self.fusion.fuse, doc_results=doc_results, web_results=web_results)
+        final = await asyncio.to_thread(self.answer_agent.generate_answer, fused, user_query=query)
+
+        return self._response(decision, doc_results, web_results, fused, final)
+
+    def stream_query(self, query: str, metadata: Dict[str, Any] = None) -> Iterator[Tuple[str, Any]]:
+        """Like run_query, but streams the answer.
+
+        Yields ('token', text) for each answer chunk, then a single
+        ('result', response) with the same shape run_query returns.
+        """
+        metadata = metadata or {}
+        decision, doc_results, web_results, fused = self._retrieve_and_fuse(query, metadata)
+
+        parts = []
+        for chunk in self.answer_agent.generate_answer_stream(fused, user_query=query):
+            parts.append(chunk)
+            yield 'token', chunk
+
+        citations = fused.get('evidence', [])
+        final = {
+            'answer': ''.join(parts),
+            'citations': citations,
+            'sources_text': self.answer_agent._format_citations(citations),
+        }
+        yield 'result', self._response(decision, doc_results, web_results, fused, final)
+
 
 # Simple CLI demo
 if __name__ == '__main__':
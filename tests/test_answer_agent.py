@@ -0,0 +1,170 @@
+from agents.answer_agent import NO_EVIDENCE_ANSWER, AnswerAgent
+from llm.mock_llm import MockLLM
+from llm.semantic_cache import SemanticCache
+
+
+class CountingLLM(MockLLM):
+    def __init__(self, fail_chat=False, fail_embed=False):
+        super().__init__()
+        self.chat_calls = 0
+        self.fail_chat = fail_chat
+        self.fail_embed = fail_embed
+
+    def chat(self, messages):
+        self.chat_calls += 1
+        if self.fail_chat:
+            raise RuntimeError("LLM down")
+        return f"answer {self.chat_calls}"
+
+    def embed(self, text):
+        if self.fail_embed:
+            raise RuntimeError("embedding down")
+        return super().embed(text)
+
+
+def _fused(*sources):
+    return {'evidence': [{'claim': f'claim from {s}', 'source': s, 'source_type': 'document'} for s in sources]}
+
+
+def test_cache_hit_skips_llm_chat():
+    llm = CountingLLM()
+    agent = AnswerAgent(llm=llm, cache=SemanticCache())
+    first = agent.generate_answer(_fused('a.pdf'), 'What changed in Q3?')
+    second = agent.generate_answer(_fused('a.pdf'), 'What changed in Q3?')
+    assert llm.chat_calls == 1
+    assert second['answer'] == first['answer']
+
+
+def test_different_citation_sources_miss():
+    llm = CountingLLM()
+    agent = AnswerAgent(llm=llm, cache=SemanticCache())
+    agent.generate_answer(_fused('a.pdf'), 'What changed in Q3?')
+    agent.generate_answer(_fused('b.pdf'), 'What changed in Q3?')
+    assert llm.chat_calls == 2
+
+
+def test_embedding_failure_runs_uncached():
+    llm = CountingLLM(fail_embed=True)
+    cache = SemanticCache()
+    agent = AnswerAgent(llm=llm, cache=cache)
+    agent.generate_answer(_fused('a.pdf'), 'q')
+    agent.generate_answer(_fused('a.pdf'), 'q')
+    assert llm.chat_calls == 2
+    assert cache._size == 0
+
+
+def test_failed_chat_is_not_cached():
+    llm = CountingLLM(fail_chat=True)
+    cache = SemanticCache()
+    agent = AnswerAgent(llm=llm, cache=cache)
+    result = agent.generate_answer(_fused('a.pdf'), 'q')
+    assert result['answer'] == 'claim from a.pdf'
+    assert cache._size == 0
+    llm.fail_chat = False
+    assert agent.generate_answer(_fused('a.pdf'), 'q')['answer'] == 'answer 2'
+
+
+class StreamingLLM(CountingLLM):
+    def __init__(self, chunks=('Revenue ', 'grew [1].'), fail_after=None):
+        super().__init__()
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.stream_calls = 0
+
+    def stream_complete(self, prompt):
+        self.stream_calls += 1
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("stream dropped")
+            yield chunk
+
+
+def test_stream_yields_chunks_and_fills_cache():
+    llm = StreamingLLM()
+    agent = AnswerAgent(llm=llm, cache=SemanticCache())
+    assert list(agent.generate_answer_stream(_fused('a.pdf'), 'q')) == ['Revenue ', 'grew [1].']
+    assert list(agent.generate_answer_stream(_fused('a.pdf'), 'q')) == ['Revenue grew [1].']
+    assert llm.stream_calls == 1
+
+
+def test_stream_failure_before_first_chunk_falls_back():
+    agent = AnswerAgent(llm=StreamingLLM(fail_after=0), cache=SemanticCache())
+    assert list(agent.generate_answer_stream(_fused('a.pdf'), 'q')) == ['claim from a.pdf']
+    assert agent.cache._size == 0
+
+
+def test_stream_failure_midway_keeps_partial_text_uncached():
+    agent = AnswerAgent(llm=StreamingLLM(fail_after=1), cache=SemanticCache())
+    assert list(agent.generate_answer_stream(_fused('a.pdf'), 'q')) == ['Revenue ']
+    assert agent.cache._size == 0
+
+
+def test_sources_text_numbers_citations_with_fallbacks():
+    agent = AnswerAgent(llm=CountingLLM())
+    citations = [
+        {'source': 'a.pdf', 'source_type': 'document'},
+        {'source': None, 'url': 'https://example.com', 'source_type': 'internet'},
+        {},
+    ]
+    assert agent._format_citations(citations) == (
+        "[1] a.pdf (document)\n[2] https://example.com (internet)\n[3] unknown (unknown)"
+    )
+
+
+class BatchReplyLLM(CountingLLM):
+    """Answers marshalled prompts with one '### Answer n' section per question."""
+
+    def __init__(self, skip=()):
+        super().__init__()
+        self.skip = set(skip)
+        self.prompts = []
+
+    def chat(self, messages):
+        self.chat_calls += 1
+        prompt = messages[-1]['content']
+        self.prompts.append(prompt)
+        count = prompt.count('### Question ')
+        if count == 0:
+            return "single answer"
+        return "\n".join(f"### Answer {n}\nbatched {n}" for n in range(1, count + 1) if n not in self.skip)
+
+
+def test_batched_answers_share_requests_in_order():
+    llm = BatchReplyLLM()
+    agent = AnswerAgent(llm=llm)
+    results = agent.generate_answers_batched([_fused(f'{i}.pdf') for i in range(7)],
+                                             [f'q{i}' for i in range(7)], batch_size=5)
+    assert llm.chat_calls == 2
+    assert [r['answer'] for r in results] == [f'batched {n}' for n in range(1, 6)] + ['batched 1', 'batched 2']
+    assert 'claim from 3.pdf' in llm.prompts[0] and 'User question: q3' in llm.prompts[0]
+    assert results[6]['sources_text'] == '[1] 6.pdf (document)'
+
+
+def test_batched_answer_missing_from_reply_is_answered_alone():
+    llm = BatchReplyLLM(skip={2})
+    agent = AnswerAgent(llm=llm, cache=SemanticCache())
+    results = agent.generate_answers_batched([_fused('a.pdf'), _fused('b.pdf')], ['first q', 'second q'])
+    assert [r['answer'] for r in results] == ['batched 1', 'single answer']
+    assert llm.chat_calls == 2
+    # both answers were cached
+    again = agent.generate_answers_batched([_fused('a.pdf'), _fused('b.pdf')], ['first q', 'second q'])
+    assert [r['answer'] for r in again] == ['batched 1', 'single answer']
+    assert llm.chat_calls == 2
+
+
+def test_batched_request_failure_falls_back_per_query():
+    llm = CountingLLM(fail_chat=True)
+    agent = AnswerAgent(llm=llm)
+    results = agent.generate_answers_batched([_fused('a.pdf'), _fused('b.pdf')], ['q1', 'q2'])
+    assert [r['answer'] for r in results] == ['claim from a.pdf', 'claim from b.pdf']
+    assert llm.chat_calls == 3
+
+
+def test_empty_evidence_skips_llm_and_cache():
+    llm = StreamingLLM()
+    agent = AnswerAgent(llm=llm, cache=SemanticCache())
+    empty = {'evidence': []}
+    assert agent.generate_answer(empty, 'q') == {'answer': NO_EVIDENCE_ANSWER, 'citations': [], 'sources_text': ''}
+    assert list(agent.generate_answer_stream(empty, 'q')) == [NO_EVIDENCE_ANSWER]
+    assert agent.generate_answers_batched([empty, empty], ['q1', 'q2'])[1]['answer'] == NO_EVIDENCE_ANSWER
+    assert (llm.chat_calls, llm.stream_calls, agent.cache._size) == (0, 0, 0)
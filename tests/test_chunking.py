@@ -1,3 +1,7 @@
+import dataclasses
+
+import pytest
+
 from ingestion.chunking import DocumentChunker
 
 
@@ -12,3 +16,64 @@ def test_chunk_by_sections():
     text = "Section one.\n\nSection two.\n\nSection three."
     sections = DocumentChunker.chunk_by_sections(text, document_id='doc2', source='test')
     assert len(sections) == 3
+
+
+def test_chunk_by_tokens_splits_on_word_boundaries():
+    text = "héllo  wörld\nfoo\tbar baz " * 3
+    chunks = DocumentChunker.chunk_by_tokens(text, max_tokens=5, document_id='doc3', source='test')
+    assert [c.metadata['word_count'] for c in chunks] == [4, 4, 4, 3]
+    assert chunks[0].content == "héllo  wörld\nfoo\tbar"
+    assert [w for c in chunks for w in c.content.split()] == text.split()
+    assert chunks[-1].chunk_id == 'doc3_token_chunk_3'
+
+
+def test_chunk_by_tokens_empty_text():
+    assert DocumentChunker.chunk_by_tokens("  \n\t", max_tokens=5) == []
+
+
+def test_chunk_by_sections_handles_crlf_and_blank_lines_with_spaces():
+    text = "One.\r\n\r\nTwo.\n  \t\nThree.\n\n\n\nFour."
+    sections = DocumentChunker.chunk_by_sections(text, document_id='doc4', source='test')
+    assert [s.content for s in sections] == ['One.', 'Two.', 'Three.', 'Four.']
+
+
+def test_chunk_text_terminates_and_covers_text():
+    text = "This is a sentence. " * 200
+    chunks = DocumentChunker.chunk_text(text, chunk_size=200, chunk_overlap=20, document_id='doc5', source='test')
+    assert chunks[0].metadata['start_position'] == 0
+    assert chunks[-1].metadata['end_position'] == len(text.rstrip())
+    for prev, nxt in zip(chunks, chunks[1:]):
+        assert prev.metadata['start_position'] < nxt.metadata['start_position'] < prev.metadata['end_position']
+    assert all(c.content.endswith('.') for c in chunks)
+
+
+def test_chunk_text_ignores_boundary_inside_overlap():
+    # The only period sits within the overlap; cutting there would move backwards
+    text = "a. " + "x" * 100
+    chunks = DocumentChunker.chunk_text(text, chunk_size=40, chunk_overlap=10)
+    assert chunks[-1].metadata['end_position'] == len(text)
+    assert len(chunks) == 4
+
+
+def test_text_chunk_is_slotted_and_immutable():
+    chunk = DocumentChunker.chunk_by_sections("One.", document_id='doc6')[0]
+    assert not hasattr(chunk, '__dict__')
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        chunk.content = 'changed'
+
+
+def test_chunk_text_positions_exclude_stripped_whitespace():
+    text = "  First line.\n\n   Second line here.  "
+    chunks = DocumentChunker.chunk_text(text, chunk_size=20, chunk_overlap=2)
+    for c in chunks:
+        start, end = c.metadata['start_position'], c.metadata['end_position']
+        assert text[start:end] == c.content
+        assert c.content == c.content.strip()
+
+
+def test_chunk_text_iter_is_lazy_and_matches_chunk_text():
+    text = "This is a sentence. " * 200
+    chunks = DocumentChunker.chunk_text_iter(text, chunk_size=200, chunk_overlap=20, document_id='doc7')
+    first = next(chunks)
+    assert first.chunk_id == 'doc7_chunk_0'
+    assert [first, *chunks] == DocumentChunker.chunk_text(text, chunk_size=200, chunk_overlap=20, document_id='doc7')
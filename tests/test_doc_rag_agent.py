@@ -0,0 +1,34 @@
+from agents import doc_rag_agent
+from agents.doc_rag_agent import DocRAGAgent
+
+
+class RecordingIndexBuilder:
+    def __init__(self):
+        self.batches = []
+
+    def add_documents_batch(self, documents):
+        self.batches.append(documents)
+        return [d['id'] for d in documents]
+
+
+def test_ingest_directory_batches_loaded_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(doc_rag_agent, 'INDEX_BATCH_SIZE', 2)
+    for i in range(5):
+        (tmp_path / f"doc{i}.txt").write_text(f"content {i}")
+    (tmp_path / "skip.bin").write_bytes(b"\x00")
+
+    builder = RecordingIndexBuilder()
+    ids = DocRAGAgent(index_builder=builder).ingest_directory(str(tmp_path))
+
+    assert sorted(ids) == [f"doc{i}" for i in range(5)]
+    assert [len(b) for b in builder.batches] == [2, 2, 1]
+    assert all(d['metadata']['filename'] == d['id'] + '.txt' for b in builder.batches for d in b)
+
+
+def test_ingest_directory_skips_unreadable_files(tmp_path):
+    (tmp_path / "good.txt").write_text("fine")
+    (tmp_path / "bad.txt").write_bytes(b"\xff\xfe\xfa")
+
+    ids = DocRAGAgent(index_builder=RecordingIndexBuilder()).ingest_directory(str(tmp_path))
+
+    assert ids == ["good"]
@@ -0,0 +1,83 @@
+import pytest
+
+from ingestion import document_loader
+from ingestion.document_loader import DocumentLoader
+
+def test_load_txt_matches_text_mode_read(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_bytes("naïve café\r\nline two\rline three\n".encode('utf-8'))
+    with open(path, 'r', encoding='utf-8') as f:
+        expected = f.read()
+    assert DocumentLoader.load_txt(str(path)) == expected == "naïve café\nline two\nline three\n"
+
+
+def test_load_markdown_empty_file(tmp_path):
+    path = tmp_path / "empty.md"
+    path.write_bytes(b"")
+    assert DocumentLoader.load(str(path))['content'] == ""
+
+
+def _baseline_csv_text(path):
+    import csv
+    with open(path, 'r', encoding='utf-8') as f:
+        return "".join(" | ".join(f"{k}: {v}" for k, v in row.items()) + "\n" for row in csv.DictReader(f))
+
+
+@pytest.mark.parametrize('content', [
+    'name,qty,price\nwidget,3,1.50\n"gadget, large",,007\n',
+    'a,b\n"multi\nline",x\n',
+    'a,b\n1,2,3\n4\n',
+    'a,a\n1,2\n',
+    'a,b\n',
+])
+def test_load_csv_matches_row_format(tmp_path, content):
+    path = tmp_path / "data.csv"
+    path.write_text(content, encoding='utf-8')
+    assert DocumentLoader.load_csv(str(path)) == _baseline_csv_text(path)
+
+
+@pytest.mark.parametrize('content', [
+    'a,b\n1,2,3\n4\n\n5,6\n',
+    'a,b,a\n1,2,3\n',
+    '\n1,2\n',
+    '',
+])
+def test_csv_module_rows_match_dict_reader(tmp_path, content):
+    path = tmp_path / "data.csv"
+    path.write_text(content, encoding='utf-8')
+    assert "".join(document_loader._iter_csv_rows(str(path))) == _baseline_csv_text(path)
+
+
+def test_csv_module_rows_skip_counts_only_data_rows(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text('a\n1\n\n2\n3\n', encoding='utf-8')
+    assert "".join(document_loader._iter_csv_rows(str(path), skip_rows=2)) == "a: 3\n"
+
+
+def test_load_multiple_skips_unsupported_and_directories(tmp_path):
+    (tmp_path / "a.txt").write_text("alpha")
+    (tmp_path / "B.MD").write_text("bravo")
+    (tmp_path / "image.png").write_bytes(b"\x89PNG")
+    (tmp_path / "noext").write_text("x")
+    (tmp_path / "folder.txt").mkdir()
+    docs = DocumentLoader.load_multiple(str(tmp_path))
+    assert sorted(d['filename'] for d in docs) == ['B.MD', 'a.txt']
+
+
+def test_iter_csv_streams_blocks_of_whole_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_loader, 'CSV_ROWS_PER_BLOCK', 2)
+    monkeypatch.setattr(document_loader, 'CSV_BLOCK_SIZE', 16)
+    path = tmp_path / "rows.csv"
+    path.write_text("id,name\n" + "".join(f"{i},row{i}\n" for i in range(5)), encoding='utf-8')
+
+    blocks = list(DocumentLoader.load(str(path), stream=True)['content'])
+    assert len(blocks) > 1
+    assert all(b.endswith('\n') for b in blocks)
+    assert "".join(blocks) == _baseline_csv_text(path)
+
+
+def test_iter_csv_resumes_with_csv_module_after_bad_row(tmp_path, monkeypatch):
+    monkeypatch.setattr(document_loader, 'CSV_BLOCK_SIZE', 16)
+    path = tmp_path / "ragged.csv"
+    path.write_text("a,b\n" + "".join(f"{i},{i}\n" for i in range(6)) + "7,8,9\n", encoding='utf-8')
+    assert "".join(DocumentLoader.iter_csv(str(path))) == _baseline_csv_text(path)
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+import llm.factory
+from llm.factory import set_llm
+from llm.mock_llm import MockLLM
+from agents.fusion_agent import FusionAgent
+
+
+class FailingEmbedLLM(MockLLM):
+    def embed_many(self, texts):
+        raise RuntimeError("embedding endpoint down")
+
+
+class ZeroEmbedLLM(MockLLM):
+    def embed_many(self, texts):
+        return [[0.0] * 32 for _ in texts]
+
+
+@pytest.fixture
+def use_llm():
+    previous = llm.factory._llm_instance
+    yield set_llm
+    set_llm(previous)
+
+
+DOC = {'content': 'Revenue grew 10% in Q3 across all regions on strong demand.', 'score': 0.7, 'source': 'report.pdf'}
+WEB_NEAR_DUP = {'snippet': 'Revenue grew 10% in Q3 across all regions, analysts said.', 'title': 'News', 'url': 'https://example.com/a'}
+WEB_DISTINCT = {'snippet': 'Headcount was flat year over year.', 'title': 'Other', 'url': 'https://example.com/b'}
+
+
+def test_semantic_dedup_drops_near_duplicate_and_keeps_document(use_llm):
+    use_llm(MockLLM())
+    fused = FusionAgent(semantic_dedup=True).fuse([DOC], [WEB_NEAR_DUP, WEB_DISTINCT])
+    types = sorted(c['source_type'] for c in fused['evidence'])
+    assert types == ['document', 'internet']
+    assert all(c['url'] != WEB_NEAR_DUP['url'] for c in fused['evidence'])
+
+
+@pytest.mark.parametrize('stub', [FailingEmbedLLM, ZeroEmbedLLM])
+def test_semantic_dedup_falls_back_to_shingle_match(use_llm, stub):
+    use_llm(stub())
+    exact_dup = {'snippet': DOC['content'], 'title': 'Copy', 'url': 'https://example.com/c'}
+    fused = FusionAgent(semantic_dedup=True).fuse([DOC], [exact_dup, WEB_NEAR_DUP])
+    # the copy is dropped by shingle similarity, the loose paraphrase is not
+    urls = [c['url'] for c in fused['evidence']]
+    assert len(urls) == 2
+    assert exact_dup['url'] not in urls
+    assert WEB_NEAR_DUP['url'] in urls
+
+
+def test_dedup_threshold_is_configurable(use_llm):
+    use_llm(MockLLM())
+    fused = FusionAgent(semantic_dedup=True, dedup_threshold=1.01).fuse([DOC], [WEB_NEAR_DUP])
+    assert len(fused['evidence']) == 2
+
+
+def test_shingle_dedup_catches_small_edits(use_llm):
+    use_llm(MockLLM())
+    doc = {'content': 'Supply chain disruptions in 2024 were driven mainly by port congestion and labor shortages across Asia.', 'source': 'a.pdf'}
+    web = {'snippet': 'Supply chain disruptions in 2024 were driven mainly by port congestion and labour shortages across Asia!', 'title': 'T', 'url': 'u'}
+    fused = FusionAgent().fuse([doc], [web])
+    assert [c['source_type'] for c in fused['evidence']] == ['document']
+
+
+def test_claims_are_capped_once_at_claim_max(use_llm):
+    use_llm(MockLLM())
+    long_doc = {'content': 'word ' * 200, 'source': 'long.pdf'}
+    fused = FusionAgent().fuse([long_doc], [])
+    claim = fused['evidence'][0]['claim']
+    assert len(claim) == FusionAgent.CLAIM_MAX
+    assert claim in fused['summary_prompt']
+
+
+def test_fuse_keeps_top_evidence_by_confidence(use_llm):
+    use_llm(MockLLM())
+    words = ['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot', 'golf', 'hotel', 'india', 'juliet',
+             'kilo', 'lima', 'mike', 'november', 'oscar', 'papa', 'quebec', 'romeo', 'sierra', 'tango']
+    web = [{'snippet': f'{word} ' * 6, 'title': word, 'url': f'u{i}', 'confidence': i / 40}
+           for i, word in enumerate(words)]
+    evidence = FusionAgent().fuse([], web)['evidence']
+    assert len(evidence) == FusionAgent.MAX_EVIDENCE
+    assert [c['url'] for c in evidence] == [f'u{i}' for i in range(19, 4, -1)]
+
+
+class AngleEmbedLLM(MockLLM):
+    """Embeds 'deg <n>' claims as unit vectors at n degrees."""
+
+    def embed_many(self, texts):
+        angles = [np.radians(float(t.split()[1])) for t in texts]
+        return [[np.cos(a), np.sin(a)] for a in angles]
+
+
+def test_semantic_dedup_only_compares_against_kept_claims(use_llm):
+    use_llm(AngleEmbedLLM())
+    web = [{'snippet': f'deg {d}', 'title': str(d), 'url': f'u{d}', 'confidence': 1.0 - d / 100} for d in (0, 20, 40)]
+    fused = FusionAgent(semantic_dedup=True, dedup_threshold=0.9).fuse([], web)
+    # 20 is within the threshold of 0 and dropped; 40 is only close to the dropped 20
+    assert [c['url'] for c in fused['evidence']] == ['u0', 'u40']
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from llm.gemini import GeminiLLM
+
+
+class FakeSession:
+    def __init__(self, history):
+        self.history = list(history)
+        self.sent = []
+
+    def send_message(self, content):
+        self.sent.append(content)
+        return SimpleNamespace(text=f"reply {len(self.sent)}")
+
+
+class FakeModel:
+    def __init__(self):
+        self.sessions = []
+
+    def start_chat(self, history):
+        self.sessions.append(FakeSession(history))
+        return self.sessions[-1]
+
+
+def _llm():
+    llm = GeminiLLM(api_key="test-key", model="gemini-1.5-flash")
+    llm.client = FakeModel()
+    return llm
+
+
+def test_chat_maps_roles_into_history():
+    llm = _llm()
+    llm.chat([
+        {"role": "system", "content": "be brief"},
+        {"role": "assistant", "content": "hi"},
+        {"role": "user", "content": "question"},
+    ])
+    assert [h["role"] for h in llm.client.sessions[0].history] == ["model", "model"]
+    assert llm.client.sessions[0].sent == ["question"]
+
+
+def test_chat_reuses_session_by_id():
+    llm = _llm()
+    turns = [{"role": "user", "content": "first"}]
+    assert llm.chat(turns, session_id="s1") == "reply 1"
+    turns += [{"role": "assistant", "content": "reply 1"}, {"role": "user", "content": "second"}]
+    assert llm.chat(turns, session_id="s1") == "reply 2"
+    assert len(llm.client.sessions) == 1
+    assert llm.client.sessions[0].sent == ["first", "second"]
+
+
+def test_session_cache_is_bounded():
+    llm = _llm()
+    llm.MAX_CHAT_SESSIONS = 2
+    for sid in ("a", "b", "c"):
+        llm.chat([{"role": "user", "content": sid}], session_id=sid)
+    assert list(llm._chat_sessions) == ["b", "c"]
+    llm.end_session("b")
+    assert list(llm._chat_sessions) == ["c"]
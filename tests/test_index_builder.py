@@ -0,0 +1,151 @@
+from llama_index.core.schema import MetadataMode, TextNode
+
+from ingestion import index_builder
+from ingestion.chunking import DocumentChunker
+from ingestion.index_builder import IndexBuilder
+
+
+class FakeEmbedModel:
+    model_name = "models/embedding-001"
+    task_type = "retrieval_document"
+
+
+def _builder():
+    builder = IndexBuilder.__new__(IndexBuilder)
+    builder.embedding_model = FakeEmbedModel()
+    return builder
+
+
+def test_embed_nodes_uses_one_batched_request(monkeypatch):
+    calls = []
+
+    def fake_embed_content(model, content, task_type=None):
+        calls.append((model, list(content), task_type))
+        return {"embedding": [[float(i)] * 3 for i in range(len(content))]}
+
+    monkeypatch.setattr(index_builder.genai, "embed_content", fake_embed_content)
+    nodes = [TextNode(text=f"chunk {i}", metadata={"source": "a.txt"}) for i in range(3)]
+    _builder()._embed_nodes(nodes)
+
+    assert len(calls) == 1
+    assert calls[0][0] == "models/embedding-001" and len(calls[0][1]) == 3
+    assert [n.embedding for n in nodes] == [[0.0] * 3, [1.0] * 3, [2.0] * 3]
+
+
+def test_embed_nodes_failure_leaves_embeddings_unset(monkeypatch):
+    def boom(**kwargs):
+        raise RuntimeError("quota exceeded")
+
+    monkeypatch.setattr(index_builder.genai, "embed_content", boom)
+    nodes = [TextNode(text="chunk")]
+    _builder()._embed_nodes(nodes)
+    assert nodes[0].embedding is None
+
+
+class FakeIndex:
+    def __init__(self, fail_sources=()):
+        self.inserted = []
+        self.fail_sources = set(fail_sources)
+
+    def insert_nodes(self, nodes):
+        if {n.metadata['source'] for n in nodes} & self.fail_sources:
+            raise RuntimeError("bad node")
+        self.inserted.append(nodes)
+
+
+def _docs():
+    return [
+        {'content': 'First document. ' * 5, 'id': 'one', 'source': 'one.txt'},
+        {'content': 'Second document. ' * 5, 'id': 'two', 'source': 'two.txt'},
+    ]
+
+
+def test_add_documents_batch_embeds_and_inserts_once(monkeypatch):
+    calls = []
+    monkeypatch.setattr(index_builder.genai, "embed_content",
+                        lambda model, content, task_type=None: calls.append(content) or {"embedding": [[0.5]] * len(content)})
+    builder = _builder()
+    builder.index = FakeIndex()
+
+    assert builder.add_documents_batch(_docs()) == ['one', 'two']
+    assert len(calls) == 1 and len(calls[0]) == 2
+    assert len(builder.index.inserted) == 1
+    assert [n.metadata['source'] for n in builder.index.inserted[0]] == ['one.txt', 'two.txt']
+
+
+def test_add_documents_batch_isolates_failing_document(monkeypatch):
+    monkeypatch.setattr(index_builder.genai, "embed_content",
+                        lambda model, content, task_type=None: {"embedding": [[0.5]] * len(content)})
+    builder = _builder()
+    builder.index = FakeIndex(fail_sources={'one.txt'})
+
+    assert builder.add_documents_batch(_docs()) == ['two']
+    assert [n.metadata['source'] for batch in builder.index.inserted for n in batch] == ['two.txt']
+
+
+def test_vector_store_uses_int8_quantization_with_rescoring(tmp_path, monkeypatch):
+    monkeypatch.setattr(index_builder.config, 'QDRANT_PATH', str(tmp_path / 'qdrant'))
+    monkeypatch.setattr(index_builder.config, 'QDRANT_INT8_QUANTIZATION', True)
+    builder = IndexBuilder()
+    assert builder.vector_store._quantization_config.scalar.type == index_builder.models.ScalarType.INT8
+    assert builder.vector_store_kwargs['search_params'].quantization.rescore is True
+
+
+def test_add_document_indexes_streamed_blocks_incrementally(monkeypatch):
+    monkeypatch.setattr(index_builder.genai, "embed_content",
+                        lambda model, content, task_type=None: {"embedding": [[0.5]] * len(content)})
+    builder = _builder()
+    builder.index = FakeIndex()
+
+    builder.add_document(iter(["a: 1\n", "a: 2\n"]), document_id='rows', source='rows.csv')
+
+    assert len(builder.index.inserted) == 2
+    nodes = [n for batch in builder.index.inserted for n in batch]
+    assert [n.metadata['chunk_index'] for n in nodes] == [0, 1]
+    assert [n.metadata['start_position'] for n in nodes] == [0, 5]
+    assert [n.id_ for n in nodes] == ['rows_chunk_0', 'rows_chunk_1']
+
+
+def test_chunk_nodes_store_preview_outside_embedded_text():
+    chunk = DocumentChunker.chunk_text("x" * 300, chunk_size=400, chunk_overlap=0, source='p.txt')[0]
+    node = _builder()._chunks_to_nodes([chunk], {})[0]
+
+    assert node.metadata['_preview'] == "x" * index_builder.PREVIEW_CHARS
+    assert '_preview' not in node.get_content(metadata_mode=MetadataMode.EMBED)
+    assert '_preview' not in node.get_content(metadata_mode=MetadataMode.LLM)
+
+
+def test_extract_sources_prefers_stored_preview():
+    class Response:
+        source_nodes = [
+            TextNode(text="full text", metadata={'source': 'a.txt', '_preview': 'stored'}),
+            TextNode(text="legacy node text", metadata={'source': 'b.txt'}),
+        ]
+
+    sources = _builder()._extract_sources(Response())
+    assert sources == [
+        {'source': 'a.txt', 'content_preview': 'stored'},
+        {'source': 'b.txt', 'content_preview': 'legacy node text'},
+    ]
+
+
+def test_add_document_embeds_and_inserts_in_batches(monkeypatch):
+    calls = []
+
+    def fake_embed_content(model, content, task_type=None):
+        calls.append(len(content))
+        return {"embedding": [[0.5]] * len(content)}
+
+    monkeypatch.setattr(index_builder.genai, "embed_content", fake_embed_content)
+    monkeypatch.setattr(index_builder, "EMBED_BATCH_SIZE", 2)
+    monkeypatch.setattr(index_builder.config, "CHUNK_SIZE", 20)
+    monkeypatch.setattr(index_builder.config, "CHUNK_OVERLAP", 0)
+    builder = _builder()
+    builder.index = FakeIndex()
+
+    builder.add_document("Sentence number one. " * 5, document_id='big', source='big.txt')
+
+    assert calls == [2, 2, 2, 1]
+    assert [len(batch) for batch in builder.index.inserted] == calls
+    nodes = [n for batch in builder.index.inserted for n in batch]
+    assert [n.metadata['chunk_index'] for n in nodes] == list(range(7))
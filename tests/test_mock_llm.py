@@ -10,3 +10,8 @@ def test_create_mock_llm():
     resp = llm.chat([{'role':'user','content':'hello mock'}])
     assert 'MOCK_CHAT_REPLY' in resp
 
+
+
+def test_collect_joins_streamed_chunks():
+    llm = LLMFactory.create_llm(provider='mock')
+    assert llm.collect('abcd') == ''.join(llm.stream_complete('abcd'))
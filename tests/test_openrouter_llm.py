@@ -0,0 +1,173 @@
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from tenacity import wait_none
+
+from llm.openrouter import OpenRouterLLM
+
+
+class FakeEmbeddings:
+    def __init__(self, fail=False):
+        self.queries = []
+        self.fail = fail
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        if self.fail:
+            raise RuntimeError("embedding endpoint down")
+        return [float(len(text))]
+
+
+def _llm(embeddings):
+    llm = OpenRouterLLM(api_key="test-key")
+    llm._embeddings = embeddings
+    return llm
+
+
+def test_embeddings_client_is_created_once():
+    llm = OpenRouterLLM(api_key="test-key")
+    assert llm._embeddings_client() is llm._embeddings_client()
+
+
+def test_embed_reuses_cached_vectors():
+    fake = FakeEmbeddings()
+    llm = _llm(fake)
+    assert llm.embed("abc") == [3.0]
+    assert llm.embed("abc") == [3.0]
+    assert fake.queries == ["abc"]
+
+
+def test_embed_cache_drops_least_recently_used(monkeypatch):
+    monkeypatch.setattr(OpenRouterLLM, "EMBED_CACHE_SIZE", 2)
+    fake = FakeEmbeddings()
+    llm = _llm(fake)
+    for text in ["a", "b", "a", "c", "a", "b"]:
+        llm.embed(text)
+    assert fake.queries == ["a", "b", "c", "b"]
+
+
+def test_embed_fallback_is_not_cached():
+    fake = FakeEmbeddings(fail=True)
+    llm = _llm(fake)
+    assert llm.embed("abc") is OpenRouterLLM._ZERO_EMB
+    llm.embed("abc")
+    assert fake.queries == ["abc", "abc"]
+
+
+class FakeBatchEmbeddings(FakeEmbeddings):
+    def __init__(self, fail=False):
+        super().__init__(fail)
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding endpoint down")
+        return [[float(len(t))] for t in texts]
+
+
+def test_embed_many_batches_unique_uncached_texts():
+    fake = FakeBatchEmbeddings()
+    llm = _llm(fake)
+    llm.embed("bb")
+    vectors = llm.embed_many(["a", "bb", "ccc", "a", "dddd"], batch_size=2)
+    assert vectors == [[1.0], [2.0], [3.0], [1.0], [4.0]]
+    assert fake.batches == [["a", "ccc"], ["dddd"]]
+    assert llm.embed_many(["ccc"]) == [[3.0]]
+    assert len(fake.batches) == 2
+
+
+def test_embed_many_falls_back_to_zero_vectors():
+    fake = FakeBatchEmbeddings(fail=True)
+    llm = _llm(fake)
+    assert llm.embed_many(["a", "b"]) == [OpenRouterLLM._ZERO_EMB] * 2
+    llm.embed_many(["a"])
+    assert len(fake.batches) == 2
+
+
+def test_chat_and_embeddings_share_one_http_client():
+    llm = OpenRouterLLM(api_key="test-key")
+    assert llm.client.http_client is llm.http_client
+    assert llm._embeddings_client().http_client is llm.http_client
+
+
+class FlakyChat:
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def _maybe_fail(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise self.error
+
+    def invoke(self, messages):
+        self._maybe_fail()
+        return SimpleNamespace(content="done")
+
+    def stream(self, messages):
+        self._maybe_fail()
+        return iter([SimpleNamespace(content="a"), SimpleNamespace(content=""), SimpleNamespace(content="b")])
+
+
+def _no_wait(monkeypatch):
+    for method in (OpenRouterLLM._invoke, OpenRouterLLM._open_stream):
+        monkeypatch.setattr(method.retry, "wait", wait_none())
+
+
+def test_complete_retries_transient_errors(monkeypatch):
+    _no_wait(monkeypatch)
+    llm = OpenRouterLLM(api_key="test-key")
+    llm.clients = [FlakyChat(2, httpx.ConnectTimeout("timed out"))]
+    assert llm.complete("hi") == "done"
+    assert llm.clients[0].calls == 3
+
+
+def test_complete_does_not_retry_other_errors(monkeypatch):
+    _no_wait(monkeypatch)
+    llm = OpenRouterLLM(api_key="test-key")
+    llm.clients = [FlakyChat(1, ValueError("bad request"))]
+    with pytest.raises(ValueError):
+        llm.complete("hi")
+    assert llm.clients[0].calls == 1
+
+
+def test_stream_complete_retries_before_first_chunk(monkeypatch):
+    _no_wait(monkeypatch)
+    llm = OpenRouterLLM(api_key="test-key")
+    llm.clients = [FlakyChat(1, httpx.ConnectTimeout("timed out"))]
+    assert list(llm.stream_complete("hi")) == ["a", "b"]
+    assert llm.clients[0].calls == 2
+
+
+def test_requests_rotate_across_api_keys(monkeypatch):
+    _no_wait(monkeypatch)
+    llm = OpenRouterLLM(api_key=["key-a", "key-b"])
+    assert [c.openai_api_key.get_secret_value() for c in llm.clients] == ["key-a", "key-b"]
+    llm.clients = [FlakyChat(0, None), FlakyChat(0, None)]
+    for _ in range(3):
+        llm.complete("hi")
+    assert [c.calls for c in llm.clients] == [2, 1]
+
+
+def test_retry_moves_to_the_next_api_key(monkeypatch):
+    _no_wait(monkeypatch)
+    llm = OpenRouterLLM(api_key=["key-a", "key-b"])
+    llm.clients = [FlakyChat(1, httpx.ConnectTimeout("timed out")), FlakyChat(0, None)]
+    assert llm.complete("hi") == "done"
+    assert [c.calls for c in llm.clients] == [1, 1]
+
+
+def test_chat_converts_roles_and_skips_unknown_ones():
+    llm = OpenRouterLLM(api_key="test-key")
+    sent = []
+    llm.clients = [SimpleNamespace(invoke=lambda messages: sent.append(messages) or SimpleNamespace(content="ok"))]
+    llm.chat([
+        {"role": "system", "content": "s"},
+        {"role": "tool", "content": "t"},
+        {"role": "user", "content": "u"},
+        {"role": "assistant", "content": "a"},
+    ])
+    assert [(m.type, m.content) for m in sent[0]] == [("system", "s"), ("human", "u"), ("ai", "a")]
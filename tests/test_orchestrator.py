@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agents.router_agent import RouterAgent
+from orchestration.graph import Orchestrator
+
+
+class BarrierAgent:
+    """Returns results only if the other retrieval path runs at the same time."""
+
+    def __init__(self, barrier, result):
+        self.barrier = barrier
+        self.result = result
+
+    def _wait(self):
+        self.barrier.wait()
+        return [self.result]
+
+    def retrieve(self, query, top_k=None):
+        return self._wait()
+
+    def search(self, query, top_k=5):
+        return self._wait()
+
+
+class SimpleAgent:
+    def retrieve(self, query, top_k=None):
+        return [{'content': 'doc', 'source': 'a.pdf'}]
+
+    def search(self, query, top_k=5):
+        return [{'snippet': 'web', 'url': 'u'}]
+
+
+class FakeFusion:
+    def fuse(self, doc_results, web_results):
+        return {'evidence': doc_results + web_results}
+
+
+class FakeAnswerAgent:
+    def generate_answer(self, fused, user_query):
+        return {'answer': f"{len(fused['evidence'])} items", 'citations': fused['evidence'], 'sources_text': ''}
+
+
+def _orchestrator():
+    barrier = threading.Barrier(2, timeout=5)
+    orch = Orchestrator.__new__(Orchestrator)
+    orch.router = RouterAgent()
+    orch.doc_agent = BarrierAgent(barrier, {'content': 'doc', 'source': 'a.pdf'})
+    orch.web_agent = BarrierAgent(barrier, {'snippet': 'web', 'url': 'u'})
+    orch.fusion = FakeFusion()
+    orch.answer_agent = FakeAnswerAgent()
+    orch._retrieval_pool = ThreadPoolExecutor(max_workers=2)
+    orch._route_cache = functools.lru_cache(maxsize=8)(orch._route)
+    return orch
+
+
+QUERY = "latest news on supplier contracts"
+META = {'has_uploaded_docs': True}
+
+
+def test_run_query_retrieves_documents_and_web_concurrently():
+    out = _orchestrator().run_query(QUERY, META)
+    assert (out['doc_count'], out['web_count']) == (1, 1)
+    assert out['answer'] == '2 items'
+
+
+def test_arun_query_retrieves_documents_and_web_concurrently():
+    out = asyncio.run(_orchestrator().arun_query(QUERY, META))
+    assert (out['doc_count'], out['web_count']) == (1, 1)
+    assert out['answer'] == '2 items'
+
+
+def test_arun_query_skips_paths_the_router_rejects():
+    orch = _orchestrator()
+    orch.web_agent = None  # would fail if searched
+    out = asyncio.run(orch.arun_query("Compare vendor SLAs", META))
+    assert out['decision']['use_web'] is False
+    assert out['web_count'] == 0
+
+
+class CountingRouter(RouterAgent):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def decide(self, query, metadata):
+        self.calls += 1
+        return super().decide(query, metadata)
+
+
+def test_router_decisions_are_cached_per_normalized_query():
+    orch = _orchestrator()
+    orch.router = CountingRouter()
+    first = orch._decide("Compare Vendor SLAs", {'has_uploaded_docs': True, 'top_k': 3})
+    again = orch._decide("compare vendor slas", {'has_uploaded_docs': True, 'top_k': 5})
+    assert orch.router.calls == 1
+    assert first == again and first is not again
+    orch._decide("compare vendor slas", {'has_uploaded_docs': False})
+    assert orch.router.calls == 2
+
+
+class FakeBatchAnswerAgent(FakeAnswerAgent):
+    def __init__(self):
+        self.batches = []
+
+    def generate_answers_batched(self, fused_list, user_queries):
+        self.batches.append(list(user_queries))
+        return [self.generate_answer(f, q) for f, q in zip(fused_list, user_queries)]
+
+
+def test_run_queries_answers_all_queries_in_one_batch():
+    orch = _orchestrator()
+    orch.answer_agent = FakeBatchAnswerAgent()
+    orch.doc_agent = orch.web_agent = SimpleAgent()
+    queries = ["latest news on supplier contracts", "Compare vendor SLAs", "recent trends"]
+    out = orch.run_queries(queries, META)
+    assert orch.answer_agent.batches == [queries]
+    assert [o['decision']['use_web'] for o in out] == [True, False, True]
+    assert [o['answer'] for o in out] == ['2 items', '1 items', '2 items']
+
+
+def test_agents_are_built_on_first_use():
+    orch = Orchestrator()
+    assert not {'doc_agent', 'web_agent', 'fusion', 'answer_agent'} & set(vars(orch))
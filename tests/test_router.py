@@ -19,3 +19,22 @@ def test_default_uses_both_when_docs_present():
     r = RouterAgent()
     decision = r.decide("Compare vendor SLAs", {"has_uploaded_docs": True})
     assert decision["use_documents"] is True
+
+
+def test_keywords_match_whole_words_only():
+    r = RouterAgent()
+    decision = r.decide("Describe your four-hour SLA", {"has_uploaded_docs": True})
+    assert decision["use_web"] is False
+    assert decision["reason"] == "Documents sufficient"
+
+
+@pytest.mark.parametrize("query", [
+    "Summarize analyst reports on lithium",
+    "What do researchers say about sleep?",
+    "Statistical overview of EV adoption",
+    "Trending topics in logistics",
+    "FY2024 revenue guidance",
+])
+def test_inflected_web_keywords_route_to_web(query):
+    decision = RouterAgent().decide(query, {"has_uploaded_docs": True})
+    assert decision["use_web"] is True
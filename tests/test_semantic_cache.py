@@ -0,0 +1,31 @@
+import numpy as np
+
+from llm.semantic_cache import CacheConfig, SemanticCache
+
+
+def test_hit_on_similar_embedding_with_same_key():
+    cache = SemanticCache(CacheConfig(similarity_threshold=0.9))
+    cache.put([1.0, 0.0, 0.0], "answer", key="k")
+    assert cache.get([0.99, 0.05, 0.0], key="k") == "answer"
+    assert cache.get([0.99, 0.05, 0.0], key="other") is None
+    assert cache.get([0.0, 1.0, 0.0], key="k") is None
+
+
+def test_expired_and_evicted_entries_miss():
+    cache = SemanticCache(CacheConfig(ttl=-1.0))
+    cache.put([1.0, 0.0], "stale")
+    assert cache.get([1.0, 0.0]) is None
+
+    cache = SemanticCache(CacheConfig(max_entries=1))
+    cache.put([1.0, 0.0], "first")
+    cache.put([0.0, 1.0], "second")
+    assert cache.get([1.0, 0.0]) is None
+    assert cache.get([0.0, 1.0]) == "second"
+
+
+def test_float16_storage_matches_float32_lookups():
+    cache = SemanticCache(CacheConfig(similarity_threshold=0.97, float16=True))
+    cache.put([0.3, 0.5, 0.8], "answer", key="k")
+    assert cache._vectors.dtype == np.float16
+    assert cache.get([0.31, 0.5, 0.79], key="k") == "answer"
+    assert cache.get([0.8, 0.5, 0.3], key="k") is None
@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+from api import uploads
+from api.uploads import save_upload
+
+
+def _spooled(data, max_size):
+    f = tempfile.SpooledTemporaryFile(max_size=max_size)
+    f.write(data)
+    f.seek(0)
+    return f
+
+
+def test_in_memory_upload_is_not_rolled_to_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads.os, 'sendfile', lambda *a: (_ for _ in ()).throw(AssertionError('sendfile used')))
+    src = _spooled(b'small upload', max_size=1024)
+    save_upload(src, tmp_path / 'out.txt')
+    assert (tmp_path / 'out.txt').read_bytes() == b'small upload'
+    assert src._rolled is False
+
+
+def test_rolled_upload_copied_with_sendfile(tmp_path):
+    data = os.urandom(64 * 1024)
+    src = _spooled(data, max_size=1024)
+    assert src._rolled is True
+    save_upload(src, tmp_path / 'out.bin')
+    assert (tmp_path / 'out.bin').read_bytes() == data
+
+
+def test_sendfile_error_falls_back_to_buffered_copy(tmp_path, monkeypatch):
+    def broken_sendfile(*args):
+        raise OSError(22, 'Invalid argument')
+
+    monkeypatch.setattr(uploads.os, 'sendfile', broken_sendfile)
+    data = os.urandom(8 * 1024)
+    save_upload(_spooled(data, max_size=1024), tmp_path / 'out.bin')
+    assert (tmp_path / 'out.bin').read_bytes() == data
+
+
+def test_dir_nonempty(tmp_path):
+    assert uploads.dir_nonempty(tmp_path) is False
+    (tmp_path / 'doc.pdf').write_bytes(b'%PDF')
+    assert uploads.dir_nonempty(tmp_path) is True
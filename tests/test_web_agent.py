@@ -0,0 +1,61 @@
+import threading
+import time
+
+from agents.web_agent import WebAgent
+
+
+def _agent(serpapi, tavily, fallback):
+    agent = WebAgent()
+    agent.serpapi_key = 'serp-key'
+    agent.tavily_key = 'tavily-key'
+    agent._search_serpapi = serpapi
+    agent._search_tavily = tavily
+    agent._simple_http_search = fallback
+    return agent
+
+
+def test_first_non_empty_provider_wins():
+    release = threading.Event()
+    fallback_calls = []
+
+    def slow(query, top_k):
+        release.wait(5)
+        return [{'url': 'slow'}]
+
+    agent = _agent(
+        serpapi=slow,
+        tavily=lambda q, k: [{'url': 'fast'}],
+        fallback=lambda q, k: fallback_calls.append(q) or [],
+    )
+    try:
+        assert agent.search('q') == [{'url': 'fast'}]
+        assert fallback_calls == []
+    finally:
+        release.set()
+
+
+def test_timeout_returns_empty_after_fallback():
+    release = threading.Event()
+    fallback_calls = []
+
+    def hang(query, top_k):
+        release.wait(5)
+        return [{'url': 'late'}]
+
+    agent = _agent(serpapi=hang, tavily=hang, fallback=lambda q, k: fallback_calls.append(q) or [])
+    agent.SEARCH_TIMEOUT = 0.1
+    try:
+        start = time.monotonic()
+        assert agent.search('q') == []
+        assert time.monotonic() - start < 2
+        assert fallback_calls == ['q']
+    finally:
+        release.set()
+
+
+def test_fallback_used_when_no_provider_configured():
+    agent = WebAgent()
+    agent.serpapi_key = None
+    agent.tavily_key = None
+    agent._simple_http_search = lambda q, k: [{'url': 'ddg'}]
+    assert agent.search('q') == [{'url': 'ddg'}]
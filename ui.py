@@ -2,52 +2,149 @@
 Gradio web UI for the AI Answering System.
 
 Features:
-- Upload a document (PDF/DOCX/TXT/CSV) and ingest into the DocRAG index
-- Ask a query and view grounded answer + cited sources
+- Upload a document (PDF/DOCX/TXT/CSV) and ingest it into the DocRAG index
+  in the background, with job status shown in the UI
+- Ask a query and view the grounded answer as it streams, then cited sources
 
 This UI imports the local orchestrator for direct, in-process calls.
 """
 import gradio as gr
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import itertools
+import os
 import shutil
 import logging
+import threading
+import time
 
 from config import config
 from orchestration.graph import Orchestrator
 from agents.doc_rag_agent import get_doc_rag_agent
+from api.uploads import dir_nonempty
 
 logger = logging.getLogger(__name__)
 
+config.ensure_dirs()
 UPLOAD_DIR = Path(getattr(config, 'UPLOAD_DIR', './storage/uploads'))
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 orch = Orchestrator()
 doc_agent = get_doc_rag_agent()
 
+# Streamed answers are pushed to the browser at most this often (seconds),
+# or as soon as this many characters are pending
+STREAM_FLUSH_INTERVAL = 0.025
+STREAM_FLUSH_CHARS = 8192
+
+# Seconds between re-scans of UPLOAD_DIR while it is believed empty
+UPLOAD_SCAN_TTL = 5.0
+
+# Flipped by _save_and_ingest so _ask does not list the directory per question
+_has_uploaded_docs = False
+_last_upload_scan = float('-inf')
+
+
+def _uploaded_docs_present() -> bool:
+    global _has_uploaded_docs, _last_upload_scan
+    if not _has_uploaded_docs and time.monotonic() - _last_upload_scan >= UPLOAD_SCAN_TTL:
+        # Files may also be placed in UPLOAD_DIR outside the UI
+        _last_upload_scan = time.monotonic()
+        _has_uploaded_docs = dir_nonempty(UPLOAD_DIR)
+    return _has_uploaded_docs
+
+
+# Uploaded files are ingested in the background; finished jobs beyond
+# MAX_TRACKED_JOBS are dropped from the status list, oldest first
+INGEST_WORKERS = 2
+MAX_TRACKED_JOBS = 50
+# Seconds between refreshes of the ingestion status box
+INGEST_STATUS_POLL = 2.0
+
+_ingest_executor = ThreadPoolExecutor(max_workers=INGEST_WORKERS, thread_name_prefix='ingest')
+_job_ids = itertools.count(1)
+_jobs = {}  # job id -> (filename, Future)
+_jobs_lock = threading.Lock()
+
+# Buffer size for copying uploads that cannot be hardlinked
+UPLOAD_COPY_BUFFER = 8 * 1024 * 1024
+
+
+def _store_upload(src_path: Path, dest: Path) -> None:
+    """Hardlink src_path to dest when both are on one filesystem, else copy it."""
+    # Replace an earlier upload of the same name, as a copy would
+    dest.unlink(missing_ok=True)
+    try:
+        os.link(src_path, dest)
+        return
+    except OSError:
+        pass
+    with open(src_path, 'rb') as src, open(dest, 'wb') as out:
+        shutil.copyfileobj(src, out, length=UPLOAD_COPY_BUFFER)
+
 
 def _save_and_ingest(file_obj):
+    global _has_uploaded_docs
     if file_obj is None:
         return "No file provided"
     try:
         # Gradio provides a TemporaryFile-like object with .name path
         src_path = Path(file_obj.name)
         dest = UPLOAD_DIR / src_path.name
-        shutil.copy(src_path, dest)
-        doc_id = doc_agent.ingest_file(str(dest))
-        return f"Uploaded and ingested as {doc_id}"
+        _store_upload(src_path, dest)
+        _has_uploaded_docs = True
     except Exception as e:
         logger.error(f"Upload failed: {e}")
         return f"Upload failed: {e}"
 
+    job_id = next(_job_ids)
+    future = _ingest_executor.submit(doc_agent.ingest_file, str(dest))
+    with _jobs_lock:
+        _jobs[job_id] = (dest.name, future)
+        finished = [j for j, (_, f) in _jobs.items() if f.done()]
+        for j in finished[:max(0, len(_jobs) - MAX_TRACKED_JOBS)]:
+            del _jobs[j]
+    return f"Queued ingestion of {dest.name} (job {job_id}). Status: Running"
+
+
+def _ingest_status() -> str:
+    """Render one status line per tracked ingestion job, newest first."""
+    with _jobs_lock:
+        jobs = list(_jobs.items())
+    lines = []
+    for job_id, (name, future) in reversed(jobs):
+        if not future.done():
+            status = "Running"
+        elif future.exception() is not None:
+            status = f"Failed: {future.exception()}"
+        else:
+            status = f"Ingested as {future.result()}"
+        lines.append(f"Job {job_id} ({name}): {status}")
+    return "\n".join(lines)
+
 
 def _ask(query: str):
+    """Stream the answer into the UI, then show the final answer and sources.
+
+    Tokens are batched so the answer box is re-rendered at most once per
+    STREAM_FLUSH_INTERVAL, or sooner once STREAM_FLUSH_CHARS are pending.
+    """
     if not query:
-        return "", ""
-    has_uploaded_docs = any(UPLOAD_DIR.iterdir())
-    res = orch.run_query(query, metadata={'has_uploaded_docs': has_uploaded_docs})
-    answer = res.get('answer', '')
-    sources = res.get('sources_text', '')
-    return answer, sources
+        yield "", ""
+        return
+    parts = []
+    pending = 0
+    last_flush = time.monotonic()
+    for kind, data in orch.stream_query(query, metadata={'has_uploaded_docs': _uploaded_docs_present()}):
+        if kind == 'token':
+            parts.append(data)
+            pending += len(data)
+            now = time.monotonic()
+            if pending >= STREAM_FLUSH_CHARS or now - last_flush >= STREAM_FLUSH_INTERVAL:
+                yield ''.join(parts), ""
+                pending = 0
+                last_flush = now
+        else:
+            yield data.get('answer', ''), data.get('sources_text', '')
 
 
 with gr.Blocks(title="AI Answering System") as demo:
@@ -61,7 +158,11 @@ with gr.Blocks(title="AI Answering System") as demo:
         upload_btn = gr.Button("Upload & Ingest")
         upload_status = gr.Textbox(label="Upload Status", interactive=False)
 
+    ingest_jobs = gr.Textbox(label="Ingestion Jobs", lines=4, interactive=False)
+
     upload_btn.click(fn=_save_and_ingest, inputs=file_input, outputs=upload_status)
+    # Poll background ingestion progress
+    demo.load(fn=_ingest_status, inputs=None, outputs=ingest_jobs, every=INGEST_STATUS_POLL)
 
     gr.Markdown("---")
 
@@ -70,7 +171,10 @@ with gr.Blocks(title="AI Answering System") as demo:
     answer_output = gr.Textbox(label="Answer", lines=8)
     sources_output = gr.Textbox(label="Sources", lines=6)
 
-    ask_btn.click(fn=_ask, inputs=query_input, outputs=[answer_output, sources_output])
+    ask_btn.click(fn=_ask, inputs=query_input, outputs=[answer_output, sources_output], queue=True)
+
+# Generator callbacks only stream through the queue
+demo.queue()
 
 
 if __name__ == '__main__':